@@ -0,0 +1,91 @@
+"""
+Email sending throughput against a local SMTP stand-in, one connection and login
+per email sent inline (before) against the queued, pooled delivery (after).
+
+Reports how long the caller waits per email and how many emails are delivered
+per second. Run with: python -m benchmarks.email_delivery --emails 500
+"""
+
+import argparse
+import json
+import smtplib
+import statistics
+import time
+from email.mime.text import MIMEText
+
+from src.email.email_delivery import EmailDelivery, SMTPConfig
+from src.main.settings import settings
+from tests.fixtures.email import LocalSMTPServer
+
+
+def _message(*, sender: str, number: int) -> MIMEText:
+    message = MIMEText(f"<p>Benchmark email {number}</p>", "html")
+    message["Subject"] = f"Benchmark email {number}"
+    message["From"] = sender
+    message["To"] = f"user{number}@email.com"
+    return message
+
+
+def _send_inline(config: SMTPConfig, message: MIMEText) -> None:
+    server = smtplib.SMTP(config.host, config.port)
+    server.login(config.user, config.password)
+    server.send_message(message)
+    server.quit()
+
+
+def _summary(*, waits: list[float], duration: float, emails: int) -> dict[str, float]:
+    waits = sorted(waits)
+    return {
+        "emails_per_second": emails / duration,
+        "caller_wait_p50_ms": statistics.median(waits) * 1000,
+        "caller_wait_p99_ms": waits[int(len(waits) * 0.99)] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--output", help="Writes the results to a JSON file")
+    args = parser.parse_args()
+
+    smtp_server = LocalSMTPServer()
+    smtp_server.start()
+    config = smtp_server.config
+    results = {}
+
+    waits = []
+    start = time.perf_counter()
+    for number in range(args.emails):
+        message = _message(sender=config.user, number=number)
+        sent = time.perf_counter()
+        _send_inline(config, message)
+        waits.append(time.perf_counter() - sent)
+    duration = time.perf_counter() - start
+    results["inline"] = _summary(waits=waits, duration=duration, emails=args.emails)
+
+    delivery = EmailDelivery(
+        workers=settings.EMAIL_WORKERS, max_queued=args.emails, config=config
+    )
+    waits = []
+    start = time.perf_counter()
+    for number in range(args.emails):
+        message = _message(sender=config.user, number=number)
+        sent = time.perf_counter()
+        delivery.send(message)
+        waits.append(time.perf_counter() - sent)
+    delivery.shutdown()
+    duration = time.perf_counter() - start
+    results["queued"] = _summary(waits=waits, duration=duration, emails=args.emails)
+    smtp_server.stop()
+
+    print(f"emails: {args.emails}, SMTP logins: {smtp_server.logins}")
+    for mode, result in results.items():
+        values = ", ".join(f"{key}={value:.3f}" for key, value in result.items())
+        print(f"{mode}: {values}")
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Throughput and latency of the auth and user endpoints. The app is driven in process
+through an ASGI client, against the database from the settings seeded by src/db/seed.py.
+
+Every concurrent client logs in as its own user, so refresh tokens are not shared
+between them. Users created by the signup scenario are deleted afterwards.
+
+The sync mode drives the routes served from the threadpool, the async mode
+their /async counterparts that run on the event loop and the async engine.
+
+Run with: python -m benchmarks.endpoints --concurrency 8 --duration 10 --mode async
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+import httpx
+from sqlalchemy import delete
+from sqlmodel import col
+
+from benchmarks.utils import percentile
+from src.db.deps import db_session
+from src.db.seed import seed_db
+from src.main.app import server
+from src.main.settings import settings
+from src.models.user import User, UserCreate, UserGroup
+from src.repositories.user_repository import user_repository
+
+PASSWORD = "benchmark-password"
+EMAIL_DOMAIN = "benchmark.com"
+SIGNUP_EMAIL_PREFIX = "signup-"
+
+
+class ClientState:
+    def __init__(self, *, email: str, password: str) -> None:
+        self.email = email
+        self.password = password
+        self.access_token = ""
+        self.refresh_token = ""
+
+    def update_tokens(self, response: httpx.Response) -> None:
+        if response.status_code == 200:
+            tokens = response.json()
+            self.access_token = tokens["access_token"]
+            self.refresh_token = tokens["refresh_token"]
+
+    @property
+    def auth_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+Scenario = Callable[[httpx.AsyncClient, str, ClientState, ClientState], Awaitable[int]]
+
+# Path prefix of the routes of each mode
+MODES = {"sync": settings.API_V1_STR, "async": f"{settings.API_V1_STR}/async"}
+
+
+async def _login(
+    client: httpx.AsyncClient, api: str, state: ClientState, _admin: ClientState
+) -> int:
+    data = {"username": state.email, "password": state.password}
+    response = await client.post(f"{api}/login", data=data)
+    state.update_tokens(response)
+    return response.status_code
+
+
+async def _refresh(
+    client: httpx.AsyncClient, api: str, state: ClientState, _admin: ClientState
+) -> int:
+    headers = {"x-token": state.refresh_token}
+    response = await client.post(f"{api}/refresh", headers=headers)
+    state.update_tokens(response)
+    return response.status_code
+
+
+async def _get_user_me(
+    client: httpx.AsyncClient, api: str, state: ClientState, _admin: ClientState
+) -> int:
+    response = await client.get(f"{api}/users/me", headers=state.auth_headers)
+    return response.status_code
+
+
+async def _get_users(
+    client: httpx.AsyncClient, api: str, _state: ClientState, admin: ClientState
+) -> int:
+    response = await client.get(f"{api}/users/", headers=admin.auth_headers)
+    return response.status_code
+
+
+async def _signup(
+    client: httpx.AsyncClient, api: str, _state: ClientState, _admin: ClientState
+) -> int:
+    data = {
+        "email": f"{SIGNUP_EMAIL_PREFIX}{uuid.uuid4().hex}@{EMAIL_DOMAIN}",
+        "password": PASSWORD,
+    }
+    response = await client.post(f"{api}/users/signup", json=data)
+    return response.status_code
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "login": _login,
+    "refresh": _refresh,
+    "users_me": _get_user_me,
+    "users_list": _get_users,
+    "signup": _signup,
+}
+
+
+def _prepare_users(*, concurrency: int) -> list[ClientState]:
+    states = []
+    with db_session() as db:
+        seed_db(db=db)
+        for number in range(concurrency):
+            email = f"user{number}@{EMAIL_DOMAIN}"
+            if user_repository.get_by_email(db=db, email=email) is None:
+                user_create = UserCreate(
+                    email=email, password=PASSWORD, user_group=UserGroup.USER.value
+                )
+                user_repository.create_user(db=db, user_create=user_create)
+            states.append(ClientState(email=email, password=PASSWORD))
+    return states
+
+
+def _delete_signed_up_users() -> None:
+    with db_session() as db:
+        query = delete(User).where(
+            col(User.email).startswith(SIGNUP_EMAIL_PREFIX),
+            col(User.email).endswith(f"@{EMAIL_DOMAIN}"),
+        )
+        db.connection().execute(query)
+
+
+async def _run_scenario(
+    *,
+    client: httpx.AsyncClient,
+    api: str,
+    scenario: Scenario,
+    states: list[ClientState],
+    admin: ClientState,
+    duration: float,
+    warmup: int,
+) -> dict[str, float]:
+    for _ in range(warmup):
+        await asyncio.gather(*(scenario(client, api, state, admin) for state in states))
+
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(state: ClientState) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status_code = await scenario(client, api, state, admin)
+            latencies.append(time.perf_counter() - start)
+            if status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(state) for state in states))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def _run(
+    *,
+    api: str,
+    scenarios: list[str],
+    concurrency: int,
+    duration: float,
+    warmup: int,
+) -> dict[str, dict[str, float]]:
+    states = await asyncio.to_thread(_prepare_users, concurrency=concurrency)
+    admin = ClientState(email=settings.ADMIN_EMAIL, password=settings.ADMIN_PASSWORD)
+    results = {}
+
+    transport = httpx.ASGITransport(app=server)
+    async with (
+        server.router.lifespan_context(server),
+        httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client,
+    ):
+        # Tokens for the scenarios that need a logged in user
+        for state in [admin, *states]:
+            if await _login(client, api, state, admin) != 200:
+                raise RuntimeError(f"Could not log in as {state.email}")
+
+        for name in scenarios:
+            results[name] = await _run_scenario(
+                client=client,
+                api=api,
+                scenario=SCENARIOS[name],
+                states=states,
+                admin=admin,
+                duration=duration,
+                warmup=warmup,
+            )
+
+    await asyncio.to_thread(_delete_signed_up_users)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument(
+        "--warmup", type=int, default=5, help="Untimed requests per client"
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--mode", choices=list(MODES), default="sync")
+    parser.add_argument("--output", help="Writes the results to a JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        _run(
+            api=MODES[args.mode],
+            scenarios=args.scenarios,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            warmup=args.warmup,
+        )
+    )
+
+    cores = len(os.sched_getaffinity(0))
+    print(f"mode: {args.mode}, cores: {cores}, concurrency: {args.concurrency}")
+    for name, result in results.items():
+        values = ", ".join(f"{key}={value:.2f}" for key, value in result.items())
+        print(f"{name}: {values}")
+    if args.output is not None:
+        report = {
+            "version": server.version,
+            "mode": args.mode,
+            "cores": cores,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "results": results,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
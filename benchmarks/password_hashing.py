@@ -0,0 +1,108 @@
+"""
+Login password verification throughput, bcrypt called inline from the request
+threads (before) against the bounded password hasher (after).
+
+A probe thread runs a small pure Python task on a fixed interval to show how
+much the rest of the worker is stalled while passwords are verified.
+
+Run with: python -m benchmarks.password_hashing --concurrency 16 --duration 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from collections.abc import Callable
+
+from benchmarks.utils import percentile
+from src.auth.password_hasher import PasswordHasher, pwd_context
+from src.main.settings import settings
+
+PASSWORD = "benchmark-password"
+
+
+def _run(
+    *, verify: Callable[[str, str], bool], concurrency: int, duration: float
+) -> dict[str, float]:
+    hashed_password = pwd_context.hash(PASSWORD)
+    deadline = time.perf_counter() + duration
+    login_latencies: list[float] = []
+    probe_latencies: list[float] = []
+    lock = threading.Lock()
+
+    def login_loop() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            verify(PASSWORD, hashed_password)
+            with lock:
+                login_latencies.append(time.perf_counter() - start)
+
+    def probe_loop() -> None:
+        payload = {"id": 1, "email": "user@email.com", "is_active": True}
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            for _ in range(100):
+                json.dumps(payload)
+            probe_latencies.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(concurrency)]
+    threads.append(threading.Thread(target=probe_loop))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cores = len(os.sched_getaffinity(0))
+    logins_per_second = len(login_latencies) / duration
+    return {
+        "logins_per_second": logins_per_second,
+        "logins_per_second_per_core": logins_per_second / cores,
+        "login_p50_ms": statistics.median(login_latencies) * 1000,
+        "login_p95_ms": percentile(login_latencies, 95) * 1000,
+        "probe_p50_ms": statistics.median(probe_latencies) * 1000,
+        "probe_p99_ms": percentile(probe_latencies, 99) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--output", help="Writes the results to a JSON file")
+    args = parser.parse_args()
+
+    hasher = PasswordHasher(
+        max_workers=settings.PASSWORD_HASHER_WORKERS,
+        # Every request thread may wait for the hasher, none of them is rejected
+        max_pending=args.concurrency,
+    )
+    results = {
+        "inline": _run(
+            verify=pwd_context.verify,
+            concurrency=args.concurrency,
+            duration=args.duration,
+        ),
+        "hasher": _run(
+            verify=lambda password, hashed_password: hasher.verify(
+                password=password, hashed_password=hashed_password
+            ),
+            concurrency=args.concurrency,
+            duration=args.duration,
+        ),
+    }
+    hasher.shutdown()
+
+    print(f"cores: {len(os.sched_getaffinity(0))}, concurrency: {args.concurrency}")
+    for mode, result in results.items():
+        values = ", ".join(f"{key}={value:.2f}" for key, value in result.items())
+        print(f"{mode}: {values}")
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Throughput of rejected requests under each stack capture policy of the handled
+exceptions. ALWAYS matches the previous behaviour, where every exception formatted
+the stack it was raised from. The app is driven in process through an ASGI client,
+logins of unknown emails need the database from the settings.
+
+Error logs are written to /dev/null so that the terminal doesn't set the pace.
+
+Run with: python -m benchmarks.rejected_logins --concurrency 8 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+import httpx
+
+from benchmarks.utils import percentile
+from src.main.app import server
+from src.main.logging import HANDLER
+from src.main.settings import StackCapture, settings
+
+SCENARIOS = {
+    # Credential stuffing, the email is unknown so bcrypt isn't run
+    "login_unknown_email": (
+        "POST",
+        f"{settings.API_V1_STR}/login",
+        {"data": {"username": "unknown@email.com", "password": "password"}},
+    ),
+    "invalid_token": (
+        "GET",
+        f"{settings.API_V1_STR}/users/me",
+        {"headers": {"Authorization": "Bearer invalid"}},
+    ),
+}
+
+
+async def _run_scenario(
+    *, client: httpx.AsyncClient, scenario: str, concurrency: int, duration: float
+) -> dict[str, float]:
+    method, url, options = SCENARIOS[scenario]
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def client_loop() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.request(method, url, **options)  # type: ignore[arg-type]
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code >= 400
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def _run(
+    *, concurrency: int, duration: float
+) -> dict[str, dict[str, dict[str, float]]]:
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    transport = httpx.ASGITransport(app=server)
+    async with (
+        server.router.lifespan_context(server),
+        httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client,
+    ):
+        for policy in StackCapture:
+            settings.EXCEPTION_STACK_4XX = policy
+            results[policy.value] = {
+                scenario: await _run_scenario(
+                    client=client,
+                    scenario=scenario,
+                    concurrency=concurrency,
+                    duration=duration,
+                )
+                for scenario in SCENARIOS
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--output", help="Writes the results to a JSON file")
+    args = parser.parse_args()
+
+    if isinstance(HANDLER, logging.StreamHandler):
+        HANDLER.setStream(open(os.devnull, "w"))
+
+    results = asyncio.run(_run(concurrency=args.concurrency, duration=args.duration))
+
+    print(
+        f"concurrency: {args.concurrency}, "
+        f"sample rate: {settings.EXCEPTION_STACK_SAMPLE_RATE}"
+    )
+    for policy, scenarios in results.items():
+        for scenario, result in scenarios.items():
+            values = ", ".join(f"{key}={value:.2f}" for key, value in result.items())
+            print(f"{policy} {scenario}: {values}")
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
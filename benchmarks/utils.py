@@ -0,0 +1,6 @@
+def percentile(values: list[float], percentile: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(int(len(values) * percentile / 100), len(values) - 1)
+    return values[index]
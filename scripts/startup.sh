@@ -1,21 +1,21 @@
 #!/bin/bash
 
-# Check if the DB is alive
-python src/db/ping.py
-
-# Apply migrations
-alembic -c ./src/db/alembic.ini upgrade head
+# Metrics of the previous run's workers would be added to the new ones,
+# prepared before any step imports the metrics
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
 
-# Checks if the migrations head is latest
-python src/db/migration_head.py
+# Waits for the DB, applies migrations, checks the migrations head
+# and creates the initial DB data, in one process. Its metrics, like the
+# hashing of seeded passwords, are kept out of the workers' ones
+env -u PROMETHEUS_MULTIPROC_DIR python src/db/bootstrap.py
 ret=$?
 if [ $ret -ne 0 ]; then
-  exit
+  exit $ret
 fi
 
-# Create the initial DB data
-python src/db/seed.py
-
 # Run the backend service
 if [ $1 = "--dev" ]; then
   fastapi run --reload src/main/app.py
@@ -5,24 +5,143 @@ from fastapi.params import Depends
 from fastapi.security import OAuth2PasswordBearer
 
 from src.auth.oauth import OAuth
-from src.db.deps import SessionDep
+from src.db.deps import AsyncSessionDep, SessionDep
+from src.exceptions.bad_request_400 import InactiveUser400Exception
+from src.exceptions.forbidden_403 import InvalidToken403Exception
 from src.main.settings import settings
-from src.models.user import User
-from src.services.user_service import user_service
+from src.models.token import TokenPayload
+from src.models.user import Principal, User
+from src.services.user_service import async_user_service, user_service
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/login")
 
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(db: SessionDep, token: TokenDep) -> User:
-    refresh_token_list = OAuth.validate_user_token(
+def get_token_payload(token: TokenDep) -> TokenPayload:
+    return OAuth.validate_user_token(
         token=token, secret_key=settings.AUTH_ACCESS_TOKEN_KEY
     )
-    user = user_service.get_active_user_by_id(
-        db=db, user_id=uuid.UUID(refresh_token_list.sub)
+
+
+TokenPayloadDep = Annotated[TokenPayload, Depends(get_token_payload)]
+
+
+def _check_token_version(*, token_payload: TokenPayload, user: User) -> None:
+    if token_payload.ver is not None and token_payload.ver != user.token_version:
+        raise InvalidToken403Exception("Token has been revoked")
+
+
+def _is_newer_than_cache(*, token_payload: TokenPayload, user: User) -> bool:
+    # Issued after the cached copy was loaded, it's reloaded before rejecting
+    return token_payload.ver is not None and token_payload.ver > user.token_version
+
+
+def _get_stateless_principal(token_payload: TokenPayload) -> Principal | None:
+    if not (settings.ACCESS_TOKEN_STATELESS and token_payload.is_stateless):
+        return None
+    # Authorized from the claims, without loading the user
+    if not token_payload.is_active:
+        raise InactiveUser400Exception("Inactive user")
+    return Principal(
+        id=uuid.UUID(token_payload.sub), user_group=token_payload.user_group
     )
-    return user
+
+
+class UserLoader:
+    """
+    Loads the user of the token once per request, on first use. FastAPI caches
+    the loader per request, so CurrentUser and CurrentPrincipal share one load
+    """
+
+    def __init__(self, db: SessionDep, token_payload: TokenPayloadDep) -> None:
+        self.db = db
+        self.token_payload = token_payload
+        self._user: User | None = None
+
+    def get(self) -> User:
+        if self._user is None:
+            self._user = self._load()
+        return self._user
+
+    def _load(self) -> User:
+        user = user_service.get_cached_active_user_by_id(
+            db=self.db, user_id=uuid.UUID(self.token_payload.sub)
+        )
+        if _is_newer_than_cache(token_payload=self.token_payload, user=user):
+            user = user_service.reload_cached_active_user(db=self.db, user_db=user)
+        _check_token_version(token_payload=self.token_payload, user=user)
+        return user
+
+
+UserLoaderDep = Annotated[UserLoader, Depends()]
+
+
+def get_current_user(user_loader: UserLoaderDep) -> User:
+    return user_loader.get()
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
+
+
+def get_current_principal(
+    token_payload: TokenPayloadDep, user_loader: UserLoaderDep
+) -> Principal:
+    principal = _get_stateless_principal(token_payload)
+    if principal is not None:
+        return principal
+
+    user = user_loader.get()
+    return Principal(id=user.id, user_group=user.user_group)
+
+
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+
+
+class AsyncUserLoader:
+    """UserLoader of the event loop routes, loads through the async session"""
+
+    def __init__(self, db: AsyncSessionDep, token_payload: TokenPayloadDep) -> None:
+        self.db = db
+        self.token_payload = token_payload
+        self._user: User | None = None
+
+    async def get(self) -> User:
+        if self._user is None:
+            self._user = await self._load()
+        return self._user
+
+    async def _load(self) -> User:
+        user = await async_user_service.get_cached_active_user_by_id(
+            db=self.db, user_id=uuid.UUID(self.token_payload.sub)
+        )
+        if _is_newer_than_cache(token_payload=self.token_payload, user=user):
+            user = await async_user_service.reload_cached_active_user(
+                db=self.db, user_db=user
+            )
+        _check_token_version(token_payload=self.token_payload, user=user)
+        return user
+
+
+AsyncUserLoaderDep = Annotated[AsyncUserLoader, Depends()]
+
+
+async def get_current_user_async(user_loader: AsyncUserLoaderDep) -> User:
+    return await user_loader.get()
+
+
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
+
+
+async def get_current_principal_async(
+    token_payload: TokenPayloadDep, user_loader: AsyncUserLoaderDep
+) -> Principal:
+    principal = _get_stateless_principal(token_payload)
+    if principal is not None:
+        return principal
+
+    user = await user_loader.get()
+    return Principal(id=user.id, user_group=user.user_group)
+
+
+AsyncCurrentPrincipal = Annotated[Principal, Depends(get_current_principal_async)]
@@ -0,0 +1,42 @@
+import datetime as dt
+import uuid
+from typing import Annotated
+
+from fastapi import Header, Response
+
+IfNoneMatchDep = Annotated[str | None, Header()]
+
+
+class ETag:
+    """
+    Validators of single rows, built from the id and the `updated` column
+    so that they are known before the row is serialized
+    """
+
+    # Responses are per user, clients have to revalidate them on every use
+    CACHE_CONTROL = "private, no-cache"
+
+    @staticmethod
+    def of_row(*, row_id: uuid.UUID, updated: dt.datetime) -> str:
+        return f'"{row_id.hex}-{updated:%Y%m%d%H%M%S%f}"'
+
+    @staticmethod
+    def matches(*, etag: str, if_none_match: str | None) -> bool:
+        """Weak comparison, as If-None-Match is compared by RFC 9110"""
+        if if_none_match is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        candidates = (candidate.strip() for candidate in if_none_match.split(","))
+        return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+    @classmethod
+    def not_modified(cls, *, etag: str) -> Response:
+        return Response(
+            status_code=304, headers={"ETag": etag, "Cache-Control": cls.CACHE_CONTROL}
+        )
+
+    @classmethod
+    def set_headers(cls, response: Response, *, etag: str) -> None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cls.CACHE_CONTROL
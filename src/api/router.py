@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 
-from src.api.routes import health, login, users
+from src.api.routes import async_mode, health, login, metrics, users
 
 api_router = APIRouter()
 
 api_router.include_router(health.router)
+api_router.include_router(metrics.router)
 
 api_router.include_router(login.router)
 api_router.include_router(users.router)
+api_router.include_router(async_mode.router)
@@ -0,0 +1,154 @@
+import datetime as dt
+import uuid
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Response
+from fastapi.params import Depends, Header
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api.deps import AsyncCurrentUser
+from src.api.etag import ETag, IfNoneMatchDep
+from src.auth.access_checker import AsyncAccessChecker
+from src.auth.oauth import OAuth
+from src.db.deps import AsyncSessionDep
+from src.exceptions.bad_request_400 import (
+    DuplicatingUser400Exception,
+    InvalidCredentials400Exception,
+)
+from src.exceptions.forbidden_403 import InvalidToken403Exception
+from src.main.settings import settings
+from src.models.pagination import PageCursor
+from src.models.token import RefreshToken, Tokens
+from src.models.user import UserCreate, UserGroup, UserPublic, UserRegister, UsersPublic
+from src.repositories.token_repository import async_token_repository
+from src.repositories.user_repository import async_user_repository
+from src.services.user_service import async_user_service
+
+# Event loop counterparts of the routes that the endpoint benchmark drives, served
+# through the async engine instead of the threadpool to compare both modes
+router = APIRouter(prefix="/async", tags=["Async"])
+
+
+async def _issue_refresh_token(*, db: AsyncSession, user_id: uuid.UUID) -> str:
+    delta = dt.timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    expires = dt.datetime.now(dt.UTC) + delta
+    refresh_token = OAuth.encode_refresh_token(subject=str(user_id), expires=expires)
+    token_create = RefreshToken(
+        refresh_token=refresh_token,
+        user_id=user_id,
+        expires_at=expires.replace(tzinfo=None),
+    )
+    await async_token_repository.create_token(db=db, token_create=token_create)
+    return refresh_token
+
+
+@router.post(
+    "/login",
+    response_model=Tokens,
+)
+async def login(
+    db: AsyncSessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+) -> Tokens:
+    user = await async_user_repository.get_by_email(db=db, email=form_data.username)
+
+    if (
+        user is None
+        or not user.is_active
+        or not await OAuth.verify_password_async(
+            password=form_data.password, hashed_password=user.hashed_password
+        )
+    ):
+        raise InvalidCredentials400Exception("Incorrect email or password")
+
+    max_amount_of_refresh_tokens = 5
+    token_amount = await async_token_repository.count_by_user_id(db=db, user_id=user.id)
+    if token_amount >= max_amount_of_refresh_tokens:
+        await async_token_repository.delete_by_user_id(db=db, user_id=user.id)
+
+    refresh_token = await _issue_refresh_token(db=db, user_id=user.id)
+
+    return Tokens(
+        access_token=OAuth.create_access_token(subject=str(user.id), user=user),
+        refresh_token=refresh_token,
+    )
+
+
+@router.post(
+    "/refresh",
+    response_model=Tokens,
+)
+async def refresh(db: AsyncSessionDep, x_token: Annotated[str, Header()]) -> Tokens:
+    db_refresh_token = await async_token_repository.delete_by_token(
+        db=db, token=x_token
+    )
+    refresh_token_payload = OAuth.validate_user_token(
+        token=x_token,
+        secret_key=settings.AUTH_REFRESH_TOKEN_KEY,
+    )
+    user_id = uuid.UUID(refresh_token_payload.sub)
+    if db_refresh_token is None:
+        # A valid token that is no longer saved has been used before
+        await async_token_repository.delete_by_user_id(db=db, user_id=user_id)
+        # Committed here, the session is rolled back once the exception is raised
+        await db.commit()
+
+        raise InvalidToken403Exception(
+            "Invalid refresh token", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    user = None
+    if settings.ACCESS_TOKEN_STATELESS:
+        user = await async_user_service.get_active_user_by_id(db=db, user_id=user_id)
+
+    refresh_token = await _issue_refresh_token(db=db, user_id=user_id)
+
+    return Tokens(
+        access_token=OAuth.create_access_token(subject=str(user_id), user=user),
+        refresh_token=refresh_token,
+    )
+
+
+@router.get(
+    "/users/",
+    dependencies=[Depends(AsyncAccessChecker([UserGroup.ADMIN]))],
+    response_model=UsersPublic,
+)
+async def get_users(
+    db: AsyncSessionDep, limit: int = 100, cursor: str | None = None
+) -> Any:
+    page_cursor = PageCursor.decode(cursor) if cursor is not None else None
+    users = await async_user_repository.get_range_after(
+        db=db, cursor=page_cursor, limit=limit
+    )
+
+    next_cursor = None
+    if len(users) == limit:
+        last_user = users[-1]
+        next_cursor = PageCursor(created=last_user.created, id=last_user.id).encode()
+    return UsersPublic(users=users, next_cursor=next_cursor)
+
+
+@router.post("/users/signup", response_model=UserPublic)
+async def register_user(db: AsyncSessionDep, user_in: UserRegister) -> Any:
+    user = await async_user_repository.get_by_email(db=db, email=user_in.email)
+    if user is not None:
+        raise DuplicatingUser400Exception("A user with this email already exists")
+    user_create = UserCreate.model_validate(user_in)
+    return await async_user_repository.create_user(db=db, user_create=user_create)
+
+
+@router.get(
+    "/users/me",
+    dependencies=[Depends(AsyncAccessChecker([UserGroup.ADMIN, UserGroup.USER]))],
+    response_model=UserPublic,
+)
+async def get_user_me(
+    user: AsyncCurrentUser, response: Response, if_none_match: IfNoneMatchDep = None
+) -> Any:
+    etag = ETag.of_row(row_id=user.id, updated=user.updated)
+    if ETag.matches(etag=etag, if_none_match=if_none_match):
+        return ETag.not_modified(etag=etag)
+
+    ETag.set_headers(response, etag=etag)
+    return user
@@ -1,6 +1,12 @@
 from fastapi import APIRouter
+from fastapi.params import Depends
 from pydantic import BaseModel
 
+from src.auth.access_checker import AccessChecker
+from src.db.engine import db_engines
+from src.db.pool import PoolStats, TimedAsyncAdaptedQueuePool, TimedQueuePool
+from src.models.user import UserGroup
+
 router = APIRouter(tags=["Health"])
 
 
@@ -8,9 +14,29 @@ class HealthRsp(BaseModel):
     is_healthy: bool
 
 
+class DbPoolRsp(BaseModel):
+    engine: PoolStats
+    async_engine: PoolStats
+
+
 @router.get(
     "/health",
     response_model=HealthRsp,
 )
 def get_health() -> HealthRsp:
     return HealthRsp(is_healthy=True)
+
+
+@router.get(
+    "/health/db-pool",
+    dependencies=[Depends(AccessChecker([UserGroup.ADMIN]))],
+    response_model=DbPoolRsp,
+)
+def get_db_pool() -> DbPoolRsp:
+    # Statistics are per worker process, each worker reports its own pools
+    return DbPoolRsp(
+        engine=TimedQueuePool.statistics.snapshot(db_engines.engine),
+        async_engine=TimedAsyncAdaptedQueuePool.statistics.snapshot(
+            db_engines.async_engine.sync_engine
+        ),
+    )
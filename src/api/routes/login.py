@@ -1,9 +1,11 @@
+import datetime as dt
 import uuid
 from typing import Annotated
 
 from fastapi import APIRouter
 from fastapi.params import Depends, Header
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlmodel import Session
 
 from src.auth.oauth import OAuth
 from src.db.deps import SessionDep
@@ -23,6 +25,20 @@ from src.services.user_service import user_service
 router = APIRouter(tags=["Login"])
 
 
+def _issue_refresh_token(*, db: Session, user_id: uuid.UUID) -> str:
+    # Refresh tokens are saved to track which ones are valid
+    delta = dt.timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
+    expires = dt.datetime.now(dt.UTC) + delta
+    refresh_token = OAuth.encode_refresh_token(subject=str(user_id), expires=expires)
+    token_create = RefreshToken(
+        refresh_token=refresh_token,
+        user_id=user_id,
+        expires_at=expires.replace(tzinfo=None),
+    )
+    token_repository.create_token(db=db, token_create=token_create)
+    return refresh_token
+
+
 @router.post(
     "/login",
     response_model=Tokens,
@@ -43,20 +59,14 @@ def login(
 
     # To prevent potential thefts resets refresh tokens if there are 5 or more
     max_amount_of_refresh_tokens = 5
-    if len(user.tokens) >= max_amount_of_refresh_tokens:
-        for token in user.tokens:
-            token_repository.remove(db=db, db_obj=token)
+    token_amount = token_repository.count_by_user_id(db=db, user_id=user.id)
+    if token_amount >= max_amount_of_refresh_tokens:
+        token_repository.delete_by_user_id(db=db, user_id=user.id)
 
-    # Refresh tokens are saved to track which ones are valid
-    refresh_token = OAuth.create_refresh_token(subject=str(user.id))
-    token_create = RefreshToken(
-        refresh_token=refresh_token,
-        user_id=user.id,
-    )
-    token_repository.create_token(db=db, token_create=token_create)
+    refresh_token = _issue_refresh_token(db=db, user_id=user.id)
 
     return Tokens(
-        access_token=OAuth.create_access_token(subject=str(user.id)),
+        access_token=OAuth.create_access_token(subject=str(user.id), user=user),
         refresh_token=refresh_token,
     )
 
@@ -66,7 +76,7 @@ def login(
     response_model=Tokens,
 )
 def refresh(db: SessionDep, x_token: Annotated[str, Header()]) -> Tokens:
-    db_refresh_token = token_repository.get_by_token(db=db, token=x_token)
+    db_refresh_token = token_repository.delete_by_token(db=db, token=x_token)
     if db_refresh_token is None:
         # When a valid refresh token that is not in the DB is supplied
         # It means that it's an old token and potentially has been stolen
@@ -74,35 +84,34 @@ def refresh(db: SessionDep, x_token: Annotated[str, Header()]) -> Tokens:
             token=x_token,
             secret_key=settings.AUTH_REFRESH_TOKEN_KEY,
         )
-        refresh_token_list = token_repository.get_by_user_id(
-            db=db, user_id=uuid.UUID(refresh_token_payload.sub)
-        )
         # Invalidates all tokens so that the user needs to log in again
         # and the potential attacker loses access
-        for token in refresh_token_list:
-            token_repository.remove(db=db, db_obj=token)
+        token_repository.delete_by_user_id(
+            db=db, user_id=uuid.UUID(refresh_token_payload.sub)
+        )
+        # Committed here, the session is rolled back once the exception is raised
+        db.commit()
 
         raise InvalidToken403Exception(
             "Invalid refresh token", headers={"WWW-Authenticate": "Bearer"}
         )
     else:
-        token_repository.remove(db=db, db_obj=db_refresh_token)
-
         refresh_token_payload = OAuth.validate_user_token(
             token=x_token,
             secret_key=settings.AUTH_REFRESH_TOKEN_KEY,
         )
         user_id = refresh_token_payload.sub
 
-        refresh_token = OAuth.create_refresh_token(subject=user_id)
-        token_create = RefreshToken(
-            refresh_token=refresh_token,
-            user_id=uuid.UUID(user_id),
-        )
-        token_repository.create_token(db=db, token_create=token_create)
+        user = None
+        if settings.ACCESS_TOKEN_STATELESS:
+            # Claims are taken from the current row, a cached copy could carry
+            # a token version that was bumped since
+            user = user_service.get_active_user_by_id(db=db, user_id=uuid.UUID(user_id))
+
+        refresh_token = _issue_refresh_token(db=db, user_id=uuid.UUID(user_id))
 
         return Tokens(
-            access_token=OAuth.create_access_token(subject=user_id),
+            access_token=OAuth.create_access_token(subject=user_id, user=user),
             refresh_token=refresh_token,
         )
 
@@ -112,9 +121,7 @@ def refresh(db: SessionDep, x_token: Annotated[str, Header()]) -> Tokens:
     response_model=Message,
 )
 def logout(db: SessionDep, x_token: Annotated[str, Header()]) -> Message:
-    db_refresh_token = token_repository.get_by_token(db=db, token=x_token)
-    if db_refresh_token is not None:
-        token_repository.remove(db=db, db_obj=db_refresh_token)
+    token_repository.delete_by_token(db=db, token=x_token)
 
     return Message(msg="Logout successful")
 
@@ -0,0 +1,37 @@
+import secrets
+from typing import Annotated
+
+from fastapi import APIRouter
+from fastapi.params import Depends, Header
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from src.exceptions.forbidden_403 import InvalidToken403Exception
+from src.exceptions.not_found_404 import MetricsNotFound404Exception
+from src.main.metrics import render_metrics
+from src.main.settings import settings
+
+router = APIRouter(tags=["Metrics"])
+
+
+def verify_metrics_token(authorization: Annotated[str | None, Header()] = None) -> None:
+    # Scrapers can't log in as a user, they get a token of their own
+    if not settings.METRICS_TOKEN:
+        raise MetricsNotFound404Exception(obj="Metrics")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise InvalidToken403Exception(
+            "Invalid metrics token", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+@router.get(
+    "/metrics",
+    dependencies=[Depends(verify_metrics_token)],
+    response_class=Response,
+)
+def get_metrics() -> Response:
+    # In multiprocess mode the samples of every uvicorn worker are added together
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
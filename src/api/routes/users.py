@@ -1,13 +1,15 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Response
 from fastapi.params import Depends
+from fastapi.responses import StreamingResponse
 
 from src.api.deps import CurrentUser
+from src.api.etag import ETag, IfNoneMatchDep
 from src.auth.access_checker import AccessChecker
 from src.auth.oauth import OAuth
-from src.db.deps import SessionDep
+from src.db.deps import ReadSessionDep, SessionDep
 from src.email.email_sender import EmailSender
 from src.exceptions.bad_request_400 import (
     DuplicatingUser400Exception,
@@ -16,18 +18,24 @@ from src.exceptions.bad_request_400 import (
 from src.exceptions.conflict_409 import DuplicatingUser409Exception
 from src.exceptions.forbidden_403 import ForbiddenAction403Exception
 from src.main.settings import settings
+from src.models.export import ExportFormat
 from src.models.message import Message
+from src.models.pagination import PageCursor
 from src.models.user import (
+    BulkCreateStatus,
     UserCreate,
     UserGroup,
     UserPublic,
     UserRegister,
+    UsersBulkCreate,
+    UsersBulkCreated,
     UsersPublic,
     UserUpdate,
     UserUpdateMe,
     UserUpdatePassword,
 )
 from src.repositories.user_repository import user_repository
+from src.services.user_export_service import user_export_service
 from src.services.user_service import user_service
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -38,9 +46,41 @@ router = APIRouter(prefix="/users", tags=["Users"])
     dependencies=[Depends(AccessChecker([UserGroup.ADMIN]))],
     response_model=UsersPublic,
 )
-def get_users(db: SessionDep, skip: int = 0, limit: int = 100) -> Any:
-    users = user_repository.get_range(db=db, skip=skip, limit=limit)
-    return UsersPublic(users=users)
+def get_users(
+    db: ReadSessionDep, skip: int = 0, limit: int = 100, cursor: str | None = None
+) -> Any:
+    if cursor is None and skip > 0:
+        # Offset pagination, its cost grows with how deep the page is
+        users = user_repository.get_range(db=db, skip=skip, limit=limit)
+        return UsersPublic(users=users)
+
+    page_cursor = PageCursor.decode(cursor) if cursor is not None else None
+    users = user_repository.get_range_after(db=db, cursor=page_cursor, limit=limit)
+
+    next_cursor = None
+    if len(users) == limit:
+        last_user = users[-1]
+        next_cursor = PageCursor(created=last_user.created, id=last_user.id).encode()
+    return UsersPublic(users=users, next_cursor=next_cursor)
+
+
+@router.get(
+    "/export",
+    dependencies=[Depends(AccessChecker([UserGroup.ADMIN]))],
+    response_class=StreamingResponse,
+)
+def export_users(
+    db: ReadSessionDep,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+) -> StreamingResponse:
+    # Rows are written out as they are read, the response is never held in memory
+    return StreamingResponse(
+        user_export_service.stream_users(db=db, export_format=export_format),
+        media_type=export_format.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="users.{export_format.value}"'
+        },
+    )
 
 
 @router.post(
@@ -62,6 +102,20 @@ def create_user(db: SessionDep, user_in: UserCreate) -> Any:
     return user
 
 
+@router.post(
+    "/bulk",
+    dependencies=[Depends(AccessChecker([UserGroup.ADMIN]))],
+    response_model=UsersBulkCreated,
+)
+def bulk_create_users(db: SessionDep, users_in: UsersBulkCreate) -> Any:
+    # New account emails are not sent for bulk imports
+    results = user_repository.bulk_create(db=db, users_create=users_in.users)
+    created = sum(result.status == BulkCreateStatus.CREATED for result in results)
+    return UsersBulkCreated(
+        results=results, created=created, duplicates=len(results) - created
+    )
+
+
 @router.post("/signup", response_model=UserPublic)
 def register_user(db: SessionDep, user_in: UserRegister) -> Any:
     user = user_repository.get_by_email(db=db, email=user_in.email)
@@ -77,7 +131,16 @@ def register_user(db: SessionDep, user_in: UserRegister) -> Any:
     dependencies=[Depends(AccessChecker([UserGroup.ADMIN, UserGroup.USER]))],
     response_model=UserPublic,
 )
-def get_user_me(user: CurrentUser) -> Any:
+def get_user_me(
+    user: CurrentUser, response: Response, if_none_match: IfNoneMatchDep = None
+) -> Any:
+    # The user usually comes from the cache, unchanged ones are answered
+    # without a query and without serializing them
+    etag = ETag.of_row(row_id=user.id, updated=user.updated)
+    if ETag.matches(etag=etag, if_none_match=if_none_match):
+        return ETag.not_modified(etag=etag)
+
+    ETag.set_headers(response, etag=etag)
     return user
 
 
@@ -137,8 +200,19 @@ def delete_user_me(db: SessionDep, user: CurrentUser) -> Message:
     dependencies=[Depends(AccessChecker([UserGroup.ADMIN]))],
     response_model=UserPublic,
 )
-def get_user_by_id(db: SessionDep, user_id: uuid.UUID) -> Any:
+def get_user_by_id(
+    db: ReadSessionDep,
+    user_id: uuid.UUID,
+    response: Response,
+    if_none_match: IfNoneMatchDep = None,
+) -> Any:
     user = user_service.get_user_by_id(db=db, user_id=user_id)
+
+    etag = ETag.of_row(row_id=user.id, updated=user.updated)
+    if ETag.matches(etag=etag, if_none_match=if_none_match):
+        return ETag.not_modified(etag=etag)
+
+    ETag.set_headers(response, etag=etag)
     return user
 
 
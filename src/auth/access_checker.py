@@ -1,15 +1,27 @@
-from src.api.deps import CurrentUser
+from src.api.deps import AsyncCurrentPrincipal, CurrentPrincipal
 from src.exceptions.forbidden_403 import NotEnoughPrivileges403Exception
-from src.models.user import UserGroup
+from src.models.user import Principal, UserGroup
 
 
-class AccessChecker:
+class _GroupChecker:
     def __init__(self, allowed_groups: list[UserGroup]):
         self._allowed_groups = allowed_groups
 
-    def __call__(self, user: CurrentUser) -> None:
+    def _check(self, principal: Principal) -> None:
         allowed_groups = [role.value for role in self._allowed_groups]
-        if user.user_group not in allowed_groups:
+        if principal.user_group not in allowed_groups:
             raise NotEnoughPrivileges403Exception(
                 "User does not have enough privileges"
             )
+
+
+class AccessChecker(_GroupChecker):
+    def __call__(self, principal: CurrentPrincipal) -> None:
+        self._check(principal)
+
+
+class AsyncAccessChecker(_GroupChecker):
+    """AccessChecker of the event loop routes, the user is loaded asynchronously"""
+
+    async def __call__(self, principal: AsyncCurrentPrincipal) -> None:
+        self._check(principal)
@@ -1,58 +1,104 @@
 import datetime as dt
+import uuid
+from collections.abc import Sequence
+from typing import Any
 
 import jwt
 from jwt import InvalidTokenError
-from passlib.context import CryptContext
 from pydantic import ValidationError
 
+from src.auth.password_hasher import bulk_password_hasher, password_hasher
 from src.exceptions.bad_request_400 import InvalidToken400Exception
 from src.exceptions.forbidden_403 import InvalidToken403Exception
 from src.main.settings import settings
+from src.main.timing import timed
 from src.models.token import TokenPayload
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.models.user import User
 
 
 class OAuth:
     @staticmethod
     def get_password_hash(*, password: str) -> str:
-        return pwd_context.hash(password)
+        with timed("bcrypt"):
+            return password_hasher.hash(password=password)
+
+    @staticmethod
+    def get_password_hashes(*, passwords: Sequence[str]) -> list[str]:
+        with timed("bcrypt"):
+            return bulk_password_hasher.hash_many(passwords=passwords)
 
     @staticmethod
     def verify_password(*, password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(password, hashed_password)
+        with timed("bcrypt"):
+            return password_hasher.verify(
+                password=password, hashed_password=hashed_password
+            )
+
+    @staticmethod
+    async def get_password_hash_async(*, password: str) -> str:
+        with timed("bcrypt"):
+            return await password_hasher.hash_async(password=password)
 
     @staticmethod
-    def _encode_token(*, subject: str, expires: dt.datetime, token_key: str) -> str:
-        to_encode = {"exp": expires, "sub": str(subject)}
-        encoded_jwt = jwt.encode(to_encode, token_key, algorithm="HS256")
+    async def verify_password_async(*, password: str, hashed_password: str) -> bool:
+        with timed("bcrypt"):
+            return await password_hasher.verify_async(
+                password=password, hashed_password=hashed_password
+            )
+
+    @staticmethod
+    def _encode_token(
+        *,
+        subject: str,
+        expires: dt.datetime,
+        token_key: str,
+        claims: dict[str, Any] | None = None,
+    ) -> str:
+        to_encode = {**(claims or {}), "exp": expires, "sub": str(subject)}
+        with timed("jwt"):
+            encoded_jwt = jwt.encode(to_encode, token_key, algorithm="HS256")
         return encoded_jwt
 
     @classmethod
     def _create_token(
-        cls, *, subject: str, expires_minutes: int, token_key: str
+        cls,
+        *,
+        subject: str,
+        expires_minutes: int,
+        token_key: str,
+        claims: dict[str, Any] | None = None,
     ) -> str:
         expires = dt.datetime.now(dt.UTC) + dt.timedelta(minutes=expires_minutes)
         encoded_jwt = cls._encode_token(
-            subject=subject, expires=expires, token_key=token_key
+            subject=subject, expires=expires, token_key=token_key, claims=claims
         )
         return encoded_jwt
 
     @classmethod
-    def create_access_token(cls, *, subject: str) -> str:
+    def create_access_token(cls, *, subject: str, user: User | None = None) -> str:
+        claims = None
+        if user is not None and settings.ACCESS_TOKEN_STATELESS:
+            claims = {
+                "user_group": user.user_group,
+                "is_active": user.is_active,
+                "ver": user.token_version,
+            }
         access_token = cls._create_token(
             subject=subject,
             expires_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
             token_key=settings.AUTH_ACCESS_TOKEN_KEY,
+            claims=claims,
         )
         return access_token
 
     @classmethod
     def encode_refresh_token(cls, *, subject: str, expires: dt.datetime) -> str:
+        # Without an id two tokens issued to a user in the same second are equal
         refresh_token = cls._encode_token(
             subject=subject,
             expires=expires,
             token_key=settings.AUTH_REFRESH_TOKEN_KEY,
+            claims={"jti": uuid.uuid4().hex},
         )
         return refresh_token
 
@@ -62,13 +108,15 @@ class OAuth:
             subject=subject,
             expires_minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES,
             token_key=settings.AUTH_REFRESH_TOKEN_KEY,
+            claims={"jti": uuid.uuid4().hex},
         )
         return refresh_token
 
     @staticmethod
     def validate_user_token(*, token: str, secret_key: str) -> TokenPayload:
         try:
-            payload = jwt.decode(token, secret_key, algorithms=["HS256"])
+            with timed("jwt"):
+                payload = jwt.decode(token, secret_key, algorithms=["HS256"])
             token_payload = TokenPayload.model_validate(payload)
         except (InvalidTokenError, ValidationError) as exc:
             raise InvalidToken403Exception(
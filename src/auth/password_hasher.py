@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+from passlib.context import CryptContext
+
+from src.exceptions.service_unavailable_503 import ServerBusy503Exception
+from src.main.metrics import PASSWORD_HASHER_DURATION
+from src.main.settings import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+ResultType = TypeVar("ResultType")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, bounded thread pool. bcrypt releases the GIL
+    while hashing so the rest of the worker keeps serving requests, and the
+    pool size caps how many CPU cores a login spike can take.
+    Once max_pending operations are queued new ones are rejected
+    instead of piling up latency.
+    """
+
+    def __init__(
+        self, *, max_workers: int, max_pending: int, name: str = "password-hasher"
+    ) -> None:
+        self._max_workers = max_workers
+        self._name = name
+        self._pending_slots = threading.BoundedSemaphore(max_pending)
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created on first use so that it can be started again after a shutdown
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=self._name,
+                )
+            return self._executor
+
+    def _submit(self, fn: Callable[..., ResultType], *args: str) -> Future[ResultType]:
+        if not self._pending_slots.acquire(blocking=False):
+            raise ServerBusy503Exception("Too many password operations in progress")
+
+        duration = PASSWORD_HASHER_DURATION.labels(operation=fn.__name__)
+
+        def run() -> ResultType:
+            # Released before the future resolves, a caller waiting on it
+            # can submit again right away
+            try:
+                with duration.time():
+                    return fn(*args)
+            finally:
+                self._pending_slots.release()
+
+        try:
+            return self._get_executor().submit(run)
+        except RuntimeError:
+            self._pending_slots.release()
+            raise
+
+    def hash(self, *, password: str) -> str:
+        return self._submit(pwd_context.hash, password).result()
+
+    def hash_many(self, *, passwords: Sequence[str]) -> list[str]:
+        # Keeps every thread busy, but at most max_workers hashes in flight,
+        # so one bulk operation doesn't fill up the pending slots of the others
+        hashes: list[str] = []
+        in_flight: deque[Future[str]] = deque()
+        for password in passwords:
+            if len(in_flight) >= self._max_workers:
+                hashes.append(in_flight.popleft().result())
+            in_flight.append(self._submit(pwd_context.hash, password))
+        hashes.extend(future.result() for future in in_flight)
+        return hashes
+
+    def verify(self, *, password: str, hashed_password: str) -> bool:
+        return self._submit(pwd_context.verify, password, hashed_password).result()
+
+    async def hash_async(self, *, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+
+    async def verify_async(self, *, password: str, hashed_password: str) -> bool:
+        future = self._submit(pwd_context.verify, password, hashed_password)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASHER_WORKERS,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING,
+)
+# Bulk imports hash on threads of their own, logins never wait behind them
+bulk_password_hasher = PasswordHasher(
+    max_workers=settings.BULK_PASSWORD_HASHER_WORKERS,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING,
+    name="bulk-password-hasher",
+)
@@ -1,15 +1,17 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from contextlib import contextmanager
 from typing import Annotated
 
 from fastapi import Depends
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.db.engine import engine
+from src.db.engine import db_engines
+from src.main.settings import settings
 
 
 def get_db() -> Generator[Session]:
-    session = Session(engine)
+    session = Session(db_engines.engine)
     try:
         yield session
         session.commit()
@@ -23,6 +25,48 @@ def get_db() -> Generator[Session]:
 SessionDep = Annotated[Session, Depends(get_db)]
 
 
+class ReadOnlySession:
+    """
+    Sessions of read-only routes, served by a replica that lags behind the
+    primary by at most `max_lag_seconds`. Routes that read their own writes,
+    or that need up to date rows, use a max lag of 0 or SessionDep
+    """
+
+    def __init__(self, *, max_lag_seconds: float) -> None:
+        self.max_lag_seconds = max_lag_seconds
+
+    def __call__(self) -> Generator[Session]:
+        engine = db_engines.replica_router.pick(max_lag_seconds=self.max_lag_seconds)
+        session = Session(engine)
+        try:
+            yield session
+        finally:
+            # Nothing to commit, closing ends the read-only transaction
+            session.close()
+
+
+get_read_db = ReadOnlySession(max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS)
+
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession]:
+    # Expired attributes can't be lazily reloaded outside of an await,
+    # so objects keep their state after the commit
+    session = AsyncSession(db_engines.async_engine, expire_on_commit=False)
+    try:
+        yield session
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        raise e
+    finally:
+        await session.close()
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
 @contextmanager
 def db_session() -> Generator[Session]:
     return get_db()
@@ -1,12 +1,138 @@
-from sqlalchemy_utils import (  # type: ignore[import-untyped]
-    create_database,
-    database_exists,
-)
+import threading
+
+from sqlalchemy import Engine, NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import create_engine
 
-from src.main.settings import settings
+from src.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, get_pool_options
+from src.db.query_counter import listen_query_counter
+from src.db.replicas import REPLICA_CONNECT_TIMEOUT, ReplicaRouter
+from src.db.slow_query_log import SlowQueryLog
+from src.main.metrics import listen_pool_metrics
+from src.main.settings import Environment, settings
+from src.main.timing import listen_query_timings
+
+
+class _Engines:
+    def __init__(self) -> None:
+        self.engine = create_engine(
+            str(settings.SQLALCHEMY_DATABASE_URI),
+            poolclass=TimedQueuePool,
+            **get_pool_options(),
+        )
+        TimedQueuePool.statistics.listen(self.engine)
+        listen_pool_metrics(self.engine, engine_name="sync")
+
+        # Serves the async routes, points to the same database as the sync engine
+        self.async_engine = create_async_engine(
+            str(settings.SQLALCHEMY_ASYNC_DATABASE_URI),
+            poolclass=TimedAsyncAdaptedQueuePool,
+            **get_pool_options(),
+        )
+        TimedAsyncAdaptedQueuePool.statistics.listen(self.async_engine.sync_engine)
+        listen_pool_metrics(self.async_engine.sync_engine, engine_name="async")
+
+        self.replica_engines = [
+            create_engine(
+                str(replica_uri),
+                connect_args={"connect_timeout": REPLICA_CONNECT_TIMEOUT},
+                **get_pool_options(),
+            )
+            for replica_uri in settings.DB_REPLICA_URIS
+        ]
+        for index, replica_engine in enumerate(self.replica_engines):
+            listen_pool_metrics(replica_engine, engine_name=f"replica_{index}")
+
+        # Registered with the engines, so that engines created on first use
+        # outside of the app lifespan are counted and timed too
+        for sync_engine in [self.engine, *self.replica_engines]:
+            self._listen_queries(sync_engine)
+        if settings.ENVIRONMENT == Environment.LOCAL:
+            listen_query_counter(self.async_engine.sync_engine)
+
+        self.replica_router = ReplicaRouter(
+            # Shares the pool of the primary engine, its sessions can't write either
+            primary=self.engine.execution_options(postgresql_readonly=True),
+            replicas=self.replica_engines,
+            selection=settings.DB_REPLICA_SELECTION,
+        )
+
+        self.explain_engine: Engine | None = None
+        if settings.DB_SLOW_QUERY_MS > 0:
+            self._listen_slow_queries()
+
+    @staticmethod
+    def _listen_queries(engine: Engine) -> None:
+        if settings.ENVIRONMENT == Environment.LOCAL:
+            listen_query_counter(engine)
+        if settings.SERVER_TIMING:
+            listen_query_timings(engine)
+
+    def _listen_slow_queries(self) -> None:
+        if settings.DB_SLOW_QUERY_EXPLAIN and settings.ENVIRONMENT == Environment.LOCAL:
+            # Unpooled, a slow query is explained while its own connection is held
+            self.explain_engine = create_engine(
+                str(settings.SQLALCHEMY_DATABASE_URI), poolclass=NullPool
+            )
+        slow_query_log = SlowQueryLog(
+            threshold_ms=settings.DB_SLOW_QUERY_MS, explain_engine=self.explain_engine
+        )
+        slow_query_log.listen(self.engine)
+        for replica_engine in self.replica_engines:
+            slow_query_log.listen(replica_engine)
+        # Plans are only taken through the sync driver, async statements are logged
+        SlowQueryLog(threshold_ms=settings.DB_SLOW_QUERY_MS).listen(
+            self.async_engine.sync_engine
+        )
+
+    async def dispose(self) -> None:
+        self.engine.dispose()
+        await self.async_engine.dispose()
+        for replica_engine in self.replica_engines:
+            replica_engine.dispose()
+        if self.explain_engine is not None:
+            self.explain_engine.dispose()
+
+
+class DatabaseEngines:
+    """
+    Engines of the worker process. They are created by init(), called from the
+    app lifespan or on first use, so that importing the app opens no
+    connections. Connections themselves are only opened once they are needed
+    """
+
+    def __init__(self) -> None:
+        self._engines: _Engines | None = None
+        self._lock = threading.Lock()
+
+    def init(self) -> None:
+        self._get_engines()
+
+    def _get_engines(self) -> _Engines:
+        # Created on first use so that they can be created again after dispose
+        with self._lock:
+            if self._engines is None:
+                self._engines = _Engines()
+            return self._engines
+
+    @property
+    def engine(self) -> Engine:
+        return self._get_engines().engine
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        return self._get_engines().async_engine
+
+    @property
+    def replica_router(self) -> ReplicaRouter:
+        return self._get_engines().replica_router
+
+    async def dispose(self) -> None:
+        """Closes the pooled connections, called when the worker shuts down"""
+        with self._lock:
+            engines, self._engines = self._engines, None
+        if engines is not None:
+            await engines.dispose()
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 
-if not database_exists(engine.url):
-    create_database(engine.url)
+db_engines = DatabaseEngines()
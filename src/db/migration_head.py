@@ -1,25 +1,27 @@
-#  type: ignore
-
 from alembic import config, script
 from alembic.runtime import migration
+from sqlalchemy import Connection
 
-from src.db.engine import engine
+from src.db.engine import db_engines
 from src.main.logging import get_logger
 
 logger = get_logger(__name__)
 
+ALEMBIC_CONFIG_PATH = "./src/db/alembic.ini"
+
 
-def check_migration_head() -> bool:
-    alembic_cfg = config.Config("./src/db/alembic.ini")
-    dir = script.ScriptDirectory.from_config(alembic_cfg)
-    with engine.begin() as connection:
-        ctx = migration.MigrationContext.configure(connection)
-        return set(ctx.get_current_heads()) == set(dir.get_heads())
+def check_migration_head(*, alembic_cfg: config.Config, connection: Connection) -> bool:
+    script_dir = script.ScriptDirectory.from_config(alembic_cfg)
+    ctx = migration.MigrationContext.configure(connection)
+    return set(ctx.get_current_heads()) == set(script_dir.get_heads())
 
 
-def main():
+def main() -> None:
     logger.info("Checking migrations head")
-    is_migration_head_latest = check_migration_head()
+    with db_engines.engine.begin() as connection:
+        is_migration_head_latest = check_migration_head(
+            alembic_cfg=config.Config(ALEMBIC_CONFIG_PATH), connection=connection
+        )
     if not is_migration_head_latest:
         raise Exception("Migration head is not latest")
     logger.info("Head is latest")
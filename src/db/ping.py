@@ -1,10 +1,14 @@
 import logging
 
 from sqlalchemy import Engine
+from sqlalchemy_utils import (  # type: ignore[import-untyped]
+    create_database,
+    database_exists,
+)
 from sqlmodel import Session, select
 from tenacity import after_log, before_log, retry, stop_after_attempt, wait_fixed
 
-from src.db.engine import engine
+from src.db.engine import db_engines
 from src.main.logging import get_logger
 
 logger = get_logger(__name__)
@@ -13,6 +17,11 @@ max_tries = 60 * 5  # 5 minutes
 wait_seconds = 1
 
 
+def create_database_if_missing(db_engine: Engine) -> None:
+    if not database_exists(db_engine.url):
+        create_database(db_engine.url)
+
+
 @retry(
     stop=stop_after_attempt(max_tries),
     wait=wait_fixed(wait_seconds),
@@ -21,6 +30,8 @@ wait_seconds = 1
 )
 def ping_db(db_engine: Engine) -> None:
     try:
+        # Checked here, the server has to be up for it
+        create_database_if_missing(db_engine)
         with Session(db_engine) as session:
             session.exec(select(1))
     except Exception as e:
@@ -30,7 +41,7 @@ def ping_db(db_engine: Engine) -> None:
 
 def main() -> None:
     logger.info("Initializing DB")
-    ping_db(engine)
+    ping_db(db_engines.engine)
     logger.info("DB initialized")
 
 
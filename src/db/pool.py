@@ -0,0 +1,139 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    PoolProxiedConnection,
+    QueuePool,
+)
+
+from src.main.settings import settings
+
+
+class PoolStats(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    overflow: int
+    peak_checked_out: int
+    checkouts: int
+    checkout_timeouts: int
+    checkout_wait_avg_ms: float
+    checkout_wait_max_ms: float
+    connections_opened: int
+    connections_invalidated: int
+
+
+class PoolStatistics:
+    """
+    Counters of a connection pool, they are kept per worker process
+    and accumulate from the start of the process
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._checked_out = 0
+        self._peak_checked_out = 0
+        self._checkouts = 0
+        self._checkout_timeouts = 0
+        self._checkout_wait_total = 0.0
+        self._checkout_wait_max = 0.0
+        self._connections_opened = 0
+        self._connections_invalidated = 0
+
+    def record_checkout_wait(self, *, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self._checkout_timeouts += 1
+                return
+            self._checkout_wait_total += seconds
+            self._checkout_wait_max = max(self._checkout_wait_max, seconds)
+
+    def _on_checkout(self, *_args: Any) -> None:
+        with self._lock:
+            self._checkouts += 1
+            self._checked_out += 1
+            self._peak_checked_out = max(self._peak_checked_out, self._checked_out)
+
+    def _on_checkin(self, *_args: Any) -> None:
+        with self._lock:
+            self._checked_out -= 1
+
+    def _on_connect(self, *_args: Any) -> None:
+        with self._lock:
+            self._connections_opened += 1
+
+    def _on_invalidate(self, *_args: Any) -> None:
+        with self._lock:
+            self._connections_invalidated += 1
+
+    def listen(self, engine: Engine) -> None:
+        # Pool events registered on the engine are kept when the pool is recreated
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def snapshot(self, engine: Engine) -> PoolStats:
+        pool = engine.pool
+        with self._lock:
+            checkouts = self._checkouts
+            wait_avg = self._checkout_wait_total / checkouts if checkouts else 0.0
+            return PoolStats(
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+                checked_out=self._checked_out,
+                overflow=max(pool.overflow(), 0) if isinstance(pool, QueuePool) else 0,
+                peak_checked_out=self._peak_checked_out,
+                checkouts=checkouts,
+                checkout_timeouts=self._checkout_timeouts,
+                checkout_wait_avg_ms=wait_avg * 1000,
+                checkout_wait_max_ms=self._checkout_wait_max * 1000,
+                connections_opened=self._connections_opened,
+                connections_invalidated=self._connections_invalidated,
+            )
+
+
+def _timed_connect(
+    connect: Callable[[], PoolProxiedConnection], statistics: PoolStatistics
+) -> PoolProxiedConnection:
+    # Pool events fire only once a connection is handed out,
+    # so the time spent waiting for it is measured around the checkout
+    start = time.perf_counter()
+    try:
+        connection = connect()
+    except exc.TimeoutError:
+        statistics.record_checkout_wait(seconds=0, timed_out=True)
+        raise
+    statistics.record_checkout_wait(
+        seconds=time.perf_counter() - start, timed_out=False
+    )
+    return connection
+
+
+class TimedQueuePool(QueuePool):
+    statistics = PoolStatistics()
+
+    def connect(self) -> PoolProxiedConnection:
+        return _timed_connect(super().connect, self.statistics)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    statistics = PoolStatistics()
+
+    def connect(self) -> PoolProxiedConnection:
+        return _timed_connect(super().connect, self.statistics)
+
+
+def get_pool_options() -> dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from sqlmodel import Session, SQLModel
+from starlette.concurrency import run_in_threadpool
+
+from src.db.deps import db_session
+from src.main.logging import get_logger
+from src.main.settings import settings
+from src.models.base import utc_now
+from src.repositories.token_repository import token_repository
+
+logger = get_logger(__name__)
+
+
+class TokenPurgeResult(SQLModel):
+    deleted: int
+    batches: int
+    duration_ms: float
+
+
+def purge_expired_tokens(*, db: Session, batch_size: int) -> TokenPurgeResult:
+    start = time.perf_counter()
+    # Fixed upfront, tokens expiring while the purge runs are left for the next one
+    now = utc_now()
+    deleted = 0
+    batches = 0
+    while True:
+        batch_deleted = token_repository.delete_expired_batch(
+            db=db, now=now, batch_size=batch_size
+        )
+        db.commit()
+        deleted += batch_deleted
+        batches += 1
+        if batch_deleted < batch_size:
+            break
+
+    result = TokenPurgeResult(
+        deleted=deleted,
+        batches=batches,
+        duration_ms=(time.perf_counter() - start) * 1000,
+    )
+    logger.info(
+        f"Purged {result.deleted} expired refresh tokens "
+        f"in {result.batches} batches, {result.duration_ms:.0f} ms"
+    )
+    return result
+
+
+def _purge() -> None:
+    with db_session() as db:
+        purge_expired_tokens(db=db, batch_size=settings.REFRESH_TOKEN_PURGE_BATCH_SIZE)
+
+
+async def purge_expired_tokens_periodically(*, interval_minutes: int) -> None:
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            await run_in_threadpool(_purge)
+        except Exception:
+            logger.exception("Failed to purge expired refresh tokens")
+
+
+def main() -> None:
+    logger.info("Purging expired refresh tokens")
+    _purge()
+
+
+if __name__ == "__main__":
+    main()
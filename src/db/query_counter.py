@@ -0,0 +1,156 @@
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Transaction control, not work that a route asks the database for
+_IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryCounter:
+    """
+    Counts the statements sent to the database, statements are compared
+    with their bound parameters left out, so the same query run once per row
+    of an earlier result (N+1) shows up as one statement repeated N times
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._statements: Counter[str] = Counter()
+
+    def record(self, statement: str) -> None:
+        if statement.startswith(_IGNORED_PREFIXES):
+            return
+        with self._lock:
+            self._statements[statement] += 1
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            return self._statements.total()
+
+    def repeated(self, *, limit: int) -> dict[str, int]:
+        """Statements run at least `limit` times"""
+        with self._lock:
+            return {
+                statement: count
+                for statement, count in self._statements.items()
+                if count >= limit
+            }
+
+    def summary(self) -> str:
+        with self._lock:
+            lines = [
+                f"{count}x {statement}"
+                for statement, count in self._statements.most_common()
+            ]
+        return "\n".join(lines)
+
+
+# Counters of the current context, threadpool calls get a copy.
+# Blocks can be nested, every enclosing counter sees the statement
+_query_counters: ContextVar[tuple[QueryCounter, ...]] = ContextVar(
+    "query_counters", default=()
+)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Counts the statements of the current context, e.g. of one request"""
+    counter = QueryCounter()
+    token = _query_counters.set((*_query_counters.get(), counter))
+    try:
+        yield counter
+    finally:
+        _query_counters.reset(token)
+
+
+def _before_cursor_execute(
+    _conn: Any, _cursor: Any, statement: str, *_args: Any
+) -> None:
+    for counter in _query_counters.get():
+        counter.record(statement)
+
+
+def listen_query_counter(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@contextmanager
+def count_engine_queries(engine: Engine) -> Iterator[QueryCounter]:
+    """Counts every statement sent through the engine, from any thread or task"""
+    counter = QueryCounter()
+
+    def before_cursor_execute(
+        _conn: Any, _cursor: Any, statement: str, *_args: Any
+    ) -> None:
+        counter.record(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class QueryBudgetMiddleware:
+    """
+    Checks the statements of every request against a budget once the response
+    starts, and against a limit of how often one statement may repeat.
+    Going over logs a warning, or fails the request when `raise_error` is set
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, budget: int, repeat_limit: int, raise_error: bool
+    ) -> None:
+        self.app = app
+        self.budget = budget
+        self.repeat_limit = repeat_limit
+        self.raise_error = raise_error
+
+    def _check(self, scope: Scope, counter: QueryCounter) -> None:
+        repeated = counter.repeated(limit=self.repeat_limit)
+        if counter.count <= self.budget and not repeated:
+            return
+
+        route = scope.get("route")
+        path = getattr(route, "path_format", scope["path"])
+        problems = []
+        if counter.count > self.budget:
+            problems.append(f"{counter.count} queries, the budget is {self.budget}")
+        if repeated:
+            problems.append(f"{len(repeated)} queries repeated, possibly N+1")
+        msg = f"{scope['method']} {path}: {', '.join(problems)}\n{counter.summary()}"
+        if self.raise_error:
+            raise QueryBudgetExceeded(msg)
+        logger.warning(msg)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as counter:
+
+            async def send_checked(message: Message) -> None:
+                # Checked before the response starts, so that raising turns it
+                # into a 500 instead of cutting off a sent response
+                if message["type"] == "http.response.start":
+                    self._check(scope, counter)
+                await send(message)
+
+            await self.app(scope, receive, send_checked)
@@ -0,0 +1,108 @@
+import math
+import threading
+import time
+from collections.abc import Sequence
+
+from sqlalchemy import Engine, text
+from sqlalchemy.pool import QueuePool
+
+from src.main.logging import get_logger
+from src.main.settings import ReplicaSelection
+
+logger = get_logger(__name__)
+
+# Seconds a measured replica lag is reused before it's measured again
+LAG_CHECK_INTERVAL = 1.0
+
+# Seconds to wait for a replica connection, lags are measured while picking
+# the engine of a request so an unreachable replica can't hold it up for long
+REPLICA_CONNECT_TIMEOUT = 2
+
+# A replica that has replayed everything it received is caught up, even when
+# the primary has been idle since the last replayed transaction. Without a WAL
+# receiver nothing more is received, the lag is unknown and the NULL rules it out
+_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+
+class _Replica:
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.lag = math.inf
+        self.checked_at = -math.inf
+
+    def connections(self) -> int:
+        pool = self.engine.pool
+        return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+    def measure_lag(self) -> None:
+        try:
+            with self.engine.connect() as connection:
+                lag = connection.execute(_LAG_QUERY).scalar()
+        except Exception:
+            logger.exception(f"Failed to check the lag of replica {self.engine.url}")
+            lag = None
+        # Nothing replayed yet, disconnected from the primary, or down
+        self.lag = math.inf if lag is None else float(lag)
+
+
+class ReplicaRouter:
+    """
+    Picks the engine of a read-only session, one of the replicas that lag
+    behind the primary by at most `max_lag_seconds`, or the primary
+    when there are none
+    """
+
+    def __init__(
+        self,
+        *,
+        primary: Engine,
+        replicas: Sequence[Engine],
+        selection: ReplicaSelection,
+    ) -> None:
+        self.primary = primary
+        self._replicas = [_Replica(engine) for engine in replicas]
+        self._selection = selection
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def _refresh_lags(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            # Marked before measuring, so concurrent requests don't measure it too
+            stale = [
+                replica
+                for replica in self._replicas
+                if now - replica.checked_at >= LAG_CHECK_INTERVAL
+            ]
+            for replica in stale:
+                replica.checked_at = now
+        for replica in stale:
+            replica.measure_lag()
+
+    def pick(self, *, max_lag_seconds: float) -> Engine:
+        """A max lag of 0 always picks the primary"""
+        if max_lag_seconds <= 0 or not self._replicas:
+            return self.primary
+
+        self._refresh_lags()
+        candidates = [
+            replica for replica in self._replicas if replica.lag <= max_lag_seconds
+        ]
+        if not candidates:
+            return self.primary
+
+        if self._selection == ReplicaSelection.LEAST_CONNECTIONS:
+            return min(candidates, key=_Replica.connections).engine
+        with self._lock:
+            replica = candidates[self._next % len(candidates)]
+            self._next += 1
+        return replica.engine
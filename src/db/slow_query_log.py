@@ -0,0 +1,159 @@
+import re
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+from sqlmodel import SQLModel
+
+from src.main.logging import get_logger
+
+logger = get_logger(__name__)
+
+SRC_DIR = Path(__file__).parents[1]
+REPOSITORIES_DIR = SRC_DIR / "repositories"
+LOCKING_CLAUSE = re.compile(r"\bFOR\s+(NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b")
+
+
+class SlowQuery(SQLModel):
+    statement: str
+    # Only the types of the values, they can hold emails, tokens and hashes
+    parameters: Any
+    caller: str
+    duration_ms: float
+    plan: str | None = None
+
+
+class SlowQueryLog:
+    """
+    Logs statements that take longer than the threshold, with the repository
+    method that ran them. With an explain engine, slow SELECTs are run again
+    there under EXPLAIN (ANALYZE, BUFFERS) and the plan is logged with them
+    """
+
+    def __init__(
+        self, *, threshold_ms: float, explain_engine: Engine | None = None
+    ) -> None:
+        self._threshold = threshold_ms / 1000
+        self._explain_engine = explain_engine
+        # Kept so that the same callables can be removed again
+        self._listeners: dict[str, Callable[..., None]] = {
+            "before_cursor_execute": self._before_cursor_execute,
+            "after_cursor_execute": self._after_cursor_execute,
+            "handle_error": self._handle_error,
+        }
+
+    def listen(self, engine: Engine) -> None:
+        for identifier, listener in self._listeners.items():
+            event.listen(engine, identifier, listener)
+
+    def remove(self, engine: Engine) -> None:
+        for identifier, listener in self._listeners.items():
+            event.remove(engine, identifier, listener)
+
+    @staticmethod
+    def _before_cursor_execute(conn: Any, *_args: Any) -> None:
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self,
+        conn: Any,
+        _cursor: Any,
+        statement: str,
+        parameters: Any,
+        _context: Any,
+        executemany: bool,
+    ) -> None:
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if duration < self._threshold:
+            return
+
+        slow_query = SlowQuery(
+            statement=statement,
+            parameters=self._redact(parameters, executemany=executemany),
+            caller=self._find_caller(sys._getframe(1)),
+            duration_ms=duration * 1000,
+        )
+        if self._explain_engine is not None and not executemany:
+            slow_query.plan = self._explain(statement, parameters)
+        self.report(slow_query)
+
+    @staticmethod
+    def _handle_error(context: ExceptionContext) -> None:
+        # Failed queries don't reach after_cursor_execute
+        if context.connection is not None:
+            starts = context.connection.info.get("slow_query_start")
+            if starts:
+                starts.pop()
+
+    @staticmethod
+    def _redact(parameters: Any, *, executemany: bool) -> Any:
+        if executemany:
+            return f"{len(parameters)} parameter sets"
+        if isinstance(parameters, dict):
+            return {key: type(value).__name__ for key, value in parameters.items()}
+        if isinstance(parameters, list | tuple):
+            return [type(value).__name__ for value in parameters]
+        return type(parameters).__name__
+
+    @staticmethod
+    def _find_caller(frame: FrameType | None) -> str:
+        """The closest repository method, otherwise the closest code of the app"""
+        fallback = None
+        while frame is not None:
+            path = Path(frame.f_code.co_filename)
+            if path.is_relative_to(REPOSITORIES_DIR):
+                # Methods inherited from the base repository are named
+                # after the repository they were called on
+                owner = frame.f_locals.get("self", frame.f_locals.get("cls"))
+                if owner is None:
+                    return frame.f_code.co_qualname
+                owner_name = (
+                    owner.__name__ if isinstance(owner, type) else type(owner).__name__
+                )
+                return f"{owner_name}.{frame.f_code.co_name}"
+            if (
+                fallback is None
+                and path.is_relative_to(SRC_DIR)
+                and path != Path(__file__)
+            ):
+                fallback = f"{path.relative_to(SRC_DIR.parent)}:{frame.f_lineno}"
+            frame = frame.f_back
+        return fallback or "unknown"
+
+    def _explain(self, statement: str, parameters: Any) -> str | None:
+        stripped = statement.lstrip().upper()
+        # Other statements would change data, and locking ones could wait
+        # on the locks that the slow query's own transaction holds
+        if not stripped.startswith("SELECT") or LOCKING_CLAUSE.search(stripped):
+            return None
+        assert self._explain_engine is not None
+        try:
+            with self._explain_engine.connect() as connection:
+                connection.exec_driver_sql("SET LOCAL statement_timeout = '10s'")
+                rows = connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                plan = "\n".join(row[0] for row in rows)
+                connection.rollback()
+        except Exception:
+            logger.exception("Failed to explain a slow query")
+            return None
+        return plan
+
+    @staticmethod
+    def report(slow_query: SlowQuery) -> None:
+        msg = (
+            f"Slow query, {slow_query.duration_ms:.1f} ms in {slow_query.caller}: "
+            f"{slow_query.statement} parameters: {slow_query.parameters}"
+        )
+        if slow_query.plan is not None:
+            msg += f"\n{slow_query.plan}"
+        logger.warning(msg)
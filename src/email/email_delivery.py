@@ -0,0 +1,196 @@
+import queue
+import smtplib
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from email.mime.text import MIMEText
+
+from sqlmodel import SQLModel
+
+from src.exceptions.service_unavailable_503 import ServerBusy503Exception
+from src.main.logging import get_logger
+from src.main.settings import settings
+
+logger = get_logger(__name__)
+
+
+def mask_email(address: str | None) -> str:
+    """Keeps the first character and the domain, enough to tell recipients apart"""
+    local, at, domain = (address or "").partition("@")
+    if not at:
+        return "***"
+    return f"{local[:1]}***@{domain}"
+
+
+class SMTPConfig(SQLModel):
+    host: str
+    port: int
+    user: str
+    password: str
+    tls: bool = True
+    ssl: bool = False
+    # Seconds, for connecting and every SMTP command
+    timeout: float = 30
+
+    @classmethod
+    def from_settings(cls) -> "SMTPConfig":
+        return cls(
+            host=settings.SMTP_HOST or "",
+            port=settings.SMTP_PORT,
+            user=settings.SMTP_USER or "",
+            password=settings.SMTP_PASSWORD or "",
+            tls=settings.SMTP_TLS,
+            ssl=settings.SMTP_SSL,
+        )
+
+
+class SMTPConnectionPool:
+    """
+    Keeps authenticated SMTP connections open between messages,
+    so the handshake, STARTTLS and login are paid once per connection
+    instead of once per email
+    """
+
+    def __init__(self, *, config: SMTPConfig, size: int) -> None:
+        self._config = config
+        self._idle: queue.LifoQueue[smtplib.SMTP] = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> smtplib.SMTP:
+        config = self._config
+        server: smtplib.SMTP
+        if config.ssl:
+            server = smtplib.SMTP_SSL(config.host, config.port, timeout=config.timeout)
+        else:
+            server = smtplib.SMTP(config.host, config.port, timeout=config.timeout)
+            if config.tls:
+                server.starttls()
+        server.login(config.user, config.password)
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except smtplib.SMTPException:
+            server.close()
+
+    def _release(self, server: smtplib.SMTP) -> None:
+        try:
+            self._idle.put_nowait(server)
+        except queue.Full:
+            self._close(server)
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        try:
+            server = self._idle.get_nowait()
+        except queue.Empty:
+            server = self._connect()
+
+        try:
+            yield server
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # The server rejected the message, the connection itself still works
+            self._release(server)
+            raise
+        except BaseException:
+            # Broken connections are dropped, the next use opens a new one
+            server.close()
+            raise
+        self._release(server)
+
+    def send(self, message: MIMEText) -> None:
+        try:
+            with self.connection() as server:
+                server.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # The server closed an idle connection, the message is sent once more
+            # over a fresh one
+            with self.connection() as server:
+                server.send_message(message)
+
+    def close(self) -> None:
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+
+class EmailDelivery:
+    """
+    Sends emails from background threads, callers only put messages in a queue.
+    Each worker uses one pooled connection at a time, so the pool holds up to
+    `workers` connections. Once max_queued emails wait, new ones are rejected
+    """
+
+    def __init__(
+        self, *, workers: int, max_queued: int, config: SMTPConfig | None = None
+    ) -> None:
+        self._workers = workers
+        self._config = config
+        self._queue: queue.Queue[MIMEText | None] = queue.Queue(maxsize=max_queued)
+        self._threads: list[threading.Thread] = []
+        self._pool: SMTPConnectionPool | None = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        # Started on first use so that it can be started again after a shutdown
+        with self._lock:
+            if self._threads:
+                return
+            config = self._config or SMTPConfig.from_settings()
+            self._pool = SMTPConnectionPool(config=config, size=self._workers)
+            for number in range(self._workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(self._pool,),
+                    name=f"email-delivery-{number}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self, pool: SMTPConnectionPool) -> None:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                self._queue.task_done()
+                return
+            try:
+                pool.send(message)
+            except Exception:
+                logger.exception(
+                    f"Failed to send an email to {mask_email(message['To'])}"
+                )
+            finally:
+                self._queue.task_done()
+
+    def send(self, message: MIMEText) -> None:
+        self._start()
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full as exc:
+            raise ServerBusy503Exception("Too many emails waiting to be sent", exc=exc)
+
+    def flush(self) -> None:
+        """Blocks until every queued email has been handled"""
+        self._queue.join()
+
+    def shutdown(self) -> None:
+        """Sends the queued emails, then stops the workers and closes the connections"""
+        with self._lock:
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads.clear()
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
+
+email_delivery = EmailDelivery(
+    workers=settings.EMAIL_WORKERS, max_queued=settings.EMAIL_MAX_QUEUED
+)
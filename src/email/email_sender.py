@@ -1,14 +1,13 @@
-import smtplib
 from email.mime.text import MIMEText
 
-from jinja2 import Template
-
+from src.email.email_delivery import email_delivery
 from src.email.email_template_schemas import (
     EmailTemplateSchema,
     NewAccountEmailTemplate,
     PasswordResetEmailTemplate,
     TestEmailTemplate,
 )
+from src.email.email_templates import email_templates
 from src.exceptions.not_implemented_501 import ActionUnavailable501Exception
 from src.main.logging import get_logger
 from src.main.settings import settings
@@ -42,19 +41,15 @@ class EmailSender:
             logger.error("SMTP_PORT is not set in .env")
             raise emails_unavailable
 
-        context = template_context.model_dump(exclude_unset=True)
-        template_str = template_context.path.read_text()
-        html_content = Template(template_str).render(context)
+        html_content = email_templates.render(template_context=template_context)
 
         html_message = MIMEText(html_content, "html")
         html_message["Subject"] = subject
         html_message["From"] = email_sender
         html_message["To"] = email_receiver
 
-        server = smtplib.SMTP(server_host, server_port)
-        server.starttls()
-        server.login(email_sender, sender_password)
-        server.sendmail(email_sender, email_receiver, html_message.as_string())
+        # Sent from a background worker, the caller doesn't wait for SMTP
+        email_delivery.send(html_message)
 
     @classmethod
     def send_test_email(cls, *, email_receiver: str) -> None:
@@ -67,7 +62,7 @@ class EmailSender:
             template_context=template_context,
             subject=f"{settings.PROJECT_NAME} - test email",
         )
-        logger.info(f"Test email sent to {email_receiver}")
+        logger.info(f"Test email queued for {email_receiver}")
 
     @classmethod
     def send_password_reset_email(cls, *, email_receiver: str, token: str) -> None:
@@ -2,13 +2,16 @@ from pathlib import Path
 
 from sqlmodel import SQLModel
 
+# HTML templates compiled from the MJML sources in templates/src
+TEMPLATES_BUILD_DIR = Path(__file__).parent / "templates" / "build"
+
 
 class EmailTemplateSchema(SQLModel):
     _template_filename: str = ""
 
     @property
-    def path(self) -> Path:
-        return Path(__file__).parent / "templates" / "build" / self._template_filename
+    def template_name(self) -> str:
+        return self._template_filename
 
 
 class TestEmailTemplate(EmailTemplateSchema):
@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from src.email.email_template_schemas import TEMPLATES_BUILD_DIR, EmailTemplateSchema
+from src.main.logging import get_logger
+from src.main.settings import settings
+
+logger = get_logger(__name__)
+
+
+class EmailTemplateRegistry:
+    """
+    Compiles every template once and renders from the compiled copy.
+    Templates are not checked for changes on disk, a restart picks them up.
+    The bytecode cache lets new worker processes skip the compile step
+    """
+
+    def __init__(self, *, directory: Path, bytecode_cache_dir: str | None) -> None:
+        self._directory = directory
+        self._environment = Environment(
+            loader=FileSystemLoader(directory),
+            bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir),
+            # Keeps every compiled template, there are only a few of them
+            cache_size=-1,
+            auto_reload=False,
+        )
+
+    def render(self, *, template_context: EmailTemplateSchema) -> str:
+        template = self._environment.get_template(template_context.template_name)
+        context = template_context.model_dump(exclude_unset=True)
+        return template.render(context)
+
+    def preload(self) -> None:
+        template_names = self._environment.list_templates()
+        if not template_names:
+            logger.warning(f"No email templates found in {self._directory}")
+        for template_name in template_names:
+            self._environment.get_template(template_name)
+        logger.info(f"Loaded {len(template_names)} email templates")
+
+
+email_templates = EmailTemplateRegistry(
+    directory=TEMPLATES_BUILD_DIR,
+    # Left empty in the .env file, it means the system temporary directory too
+    bytecode_cache_dir=settings.EMAIL_TEMPLATES_BYTECODE_CACHE_DIR or None,
+)
@@ -26,3 +26,7 @@ class DuplicatingUser400Exception(Base400Exception):
 
 class InvalidPassword400Exception(Base400Exception):
     pass
+
+
+class InvalidCursor400Exception(Base400Exception):
+    pass
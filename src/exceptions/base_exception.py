@@ -1,5 +1,20 @@
+import random
+import sys
 import traceback
 
+from src.main.settings import StackCapture, settings
+
+
+def should_capture_stack(status_code: int) -> bool:
+    policy = (
+        settings.EXCEPTION_STACK_5XX
+        if status_code >= 500
+        else settings.EXCEPTION_STACK_4XX
+    )
+    if policy == StackCapture.SAMPLED:
+        return random.random() < settings.EXCEPTION_STACK_SAMPLE_RATE
+    return policy == StackCapture.ALWAYS
+
 
 class BaseHTTPException(Exception):
     status_code: int = 500
@@ -14,7 +29,14 @@ class BaseHTTPException(Exception):
         self.msg = msg
         self.exc = exc
         self.head = headers
-        self.trace_stack = "".join(traceback.format_stack()[:-2])
+        # Only the file, line and function of each frame are kept, the source
+        # lines are looked up and formatted if the trace is logged
+        self.stack: traceback.StackSummary | None = None
+        if should_capture_stack(self.status_code):
+            self.stack = traceback.StackSummary.extract(
+                traceback.walk_stack(sys._getframe(1)), lookup_lines=False
+            )
+            self.stack.reverse()
 
     @property
     def message(self) -> str:
@@ -29,8 +51,10 @@ class BaseHTTPException(Exception):
         )
 
     @property
-    def trace(self) -> str:
-        return self.trace_stack
+    def trace(self) -> str | None:
+        if self.stack is None:
+            return None
+        return "".join(self.stack.format())
 
     @property
     def headers(self) -> dict[str, str] | None:
@@ -3,17 +3,23 @@ from fastapi.responses import JSONResponse
 
 from src.exceptions.base_exception import BaseHTTPException
 from src.main.logging import get_logger
+from src.main.metrics import EXCEPTIONS
 
 
 class ExceptionHandler:
     logger = get_logger(__name__)
 
     async def __call__(self, request: Request, exc: BaseHTTPException) -> JSONResponse:
-        self.logger.error(
-            f"Exception occurred while processing {request.url}: {exc.exception}, "
-            + "Trace:"
-            + exc.trace
-        )
+        EXCEPTIONS.labels(
+            exception=type(exc).__name__, status_code=str(exc.status_code)
+        ).inc()
+        msg = f"Exception occurred while processing {request.url}: {exc.exception}"
+        # The stack is only kept for the exceptions that the policy of
+        # their status class selects, see EXCEPTION_STACK_4XX and _5XX
+        trace = exc.trace
+        if trace is not None:
+            msg += ", Trace:\n" + trace
+        self.logger.error(msg)
 
         return JSONResponse(
             status_code=exc.status_code,
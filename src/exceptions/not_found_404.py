@@ -28,3 +28,7 @@ class BaseNotFound404Exception(Base404Exception):
 
 class UserNotFound404Exception(BaseNotFound404Exception):
     pass
+
+
+class MetricsNotFound404Exception(BaseNotFound404Exception):
+    pass
@@ -0,0 +1,12 @@
+from src.exceptions.base_exception import BaseHTTPException
+
+
+class Base503Exception(BaseHTTPException):
+    status_code: int = 503
+
+
+# === Custom exceptions
+
+
+class ServerBusy503Exception(Base503Exception):
+    pass
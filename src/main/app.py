@@ -1,24 +1,55 @@
+import asyncio
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
-from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from src.api.router import api_router
+from src.auth.password_hasher import bulk_password_hasher, password_hasher
+from src.db.engine import db_engines
+from src.db.purge_tokens import purge_expired_tokens_periodically
+from src.db.query_counter import QueryBudgetMiddleware
+from src.email.email_delivery import email_delivery
+from src.email.email_templates import email_templates
 from src.exceptions.base_exception import BaseHTTPException
 from src.exceptions.handler import ExceptionHandler
-from src.main.settings import settings
+from src.main.compression import CompressionMiddleware
+from src.main.logging import RequestContextMiddleware
+from src.main.metrics import PrometheusMiddleware, mark_process_dead
+from src.main.settings import Environment, settings
+from src.main.timing import ServerTimingMiddleware, TimedORJSONResponse
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
     settings.enforce_non_default_secrets()
+    db_engines.init()
+    if settings.EMAIL_TEMPLATES_PRELOAD:
+        email_templates.preload()
+
+    purge_task = None
+    if settings.REFRESH_TOKEN_PURGE_INTERVAL_MINUTES > 0:
+        purge_task = asyncio.create_task(
+            purge_expired_tokens_periodically(
+                interval_minutes=settings.REFRESH_TOKEN_PURGE_INTERVAL_MINUTES
+            )
+        )
     yield
+    if purge_task is not None:
+        purge_task.cancel()
+        # Waited for, a purge in progress releases its connection before disposal
+        with suppress(asyncio.CancelledError):
+            await purge_task
+    password_hasher.shutdown()
+    bulk_password_hasher.shutdown()
+    email_delivery.shutdown()
+    await db_engines.dispose()
+    mark_process_dead()
 
 
 server = FastAPI(
-    default_response_class=ORJSONResponse,
+    default_response_class=TimedORJSONResponse,
     title="Template API",
     version="0.0.1",
     lifespan=lifespan,
@@ -32,6 +63,28 @@ server.add_middleware(
     allow_origins=["*"],
 )
 
+if settings.COMPRESSION:
+    server.add_middleware(
+        CompressionMiddleware,
+        min_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+server.add_middleware(PrometheusMiddleware)
+server.add_middleware(RequestContextMiddleware)
+
+if settings.ENVIRONMENT == Environment.LOCAL:
+    server.add_middleware(
+        QueryBudgetMiddleware,
+        budget=settings.DB_QUERY_BUDGET,
+        repeat_limit=settings.DB_QUERY_REPEAT_LIMIT,
+        raise_error=settings.DB_QUERY_BUDGET_RAISE,
+    )
+
+if settings.SERVER_TIMING:
+    server.add_middleware(ServerTimingMiddleware)
+
 server.add_exception_handler(BaseHTTPException, ExceptionHandler())  # type: ignore
 
 server.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,6 +1,24 @@
+import atexit
+import copy
+import datetime as dt
 import logging
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import IO, Any
 
-from src.main.settings import settings
+import orjson
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.main.settings import LoggingFormat, settings
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Ids sent by clients are logged and echoed back, other ones are replaced
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,128}")
 
 
 class LoggingFormatter(logging.Formatter):
@@ -21,32 +39,158 @@ class LoggingFormatter(logging.Formatter):
         logging.ERROR: error_frmt + format_str + reset,
     }
 
+    def __init__(self) -> None:
+        super().__init__()
+        # Built once instead of for every record
+        self._formatters = {
+            level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()
+        }
+        self._default_formatter = logging.Formatter()
+
     def format(self, record: logging.LogRecord) -> str:
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
+        formatter = self._formatters.get(record.levelno, self._default_formatter)
         return formatter.format(record)
 
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the request fields set by RequestContextFilter"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        log = {
+            "time": dt.datetime.fromtimestamp(record.created, dt.UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "location": f"{record.filename}:{record.lineno}",
+            "request_id": getattr(record, "request_id", None),
+            "route": getattr(record, "route", None),
+        }
+        if record.exc_info:
+            # Cached on the record for other handlers
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            log["exception"] = record.exc_text
+        return orjson.dumps(log, default=str).decode()
+
+
+class RequestContext:
+    def __init__(self, *, request_id: str, scope: Scope) -> None:
+        self.request_id = request_id
+        self._scope = scope
+
+    @property
+    def route(self) -> str:
+        # The route is only known once the router has matched the request
+        route = self._scope.get("route")
+        if route is None:
+            return str(self._scope["path"])
+        return str(route.path_format)
+
+
+_request_context: ContextVar[RequestContext | None] = ContextVar(
+    "request_context", default=None
+)
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds the request id and route to records logged while handling a request"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        record.request_id = context.request_id if context is not None else None
+        record.route = context.route if context is not None else None
+        return True
+
+
+class RequestContextMiddleware:
+    """
+    Gives every request an id, taken from the X-Request-ID header when the
+    client or a proxy sent a valid one, and returns it in the same response header
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER, "")
+        if REQUEST_ID_PATTERN.fullmatch(request_id) is None:
+            request_id = uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        token = _request_context.set(RequestContext(request_id=request_id, scope=scope))
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request_context.reset(token)
+
+
+class _LogQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> Any:
+        # Formatting is left to the listener thread, only the message is resolved
+        # here since its arguments could change before the record is written
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def create_handler(
+    *, logging_format: LoggingFormat, stream: IO[str] = sys.stderr
+) -> tuple[logging.Handler, QueueListener | None]:
+    """
+    Text logs are written by the thread that logs them. JSON logs are put
+    in a queue and written by a listener thread, so logging never waits on
+    the stream, the returned listener has to be started
+    """
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setLevel(LOG_LEVEL)
+    if logging_format == LoggingFormat.TEXT:
+        stream_handler.setFormatter(LoggingFormatter())
+        stream_handler.addFilter(RequestContextFilter())
+        return stream_handler, None
+
+    stream_handler.setFormatter(JsonFormatter())
+    queue_handler = _LogQueueHandler(queue.SimpleQueue())
+    queue_handler.setLevel(LOG_LEVEL)
+    # Filters run in the logging thread, where the request context is set
+    queue_handler.addFilter(RequestContextFilter())
+    listener = QueueListener(
+        queue_handler.queue, stream_handler, respect_handler_level=True
+    )
+    return queue_handler, listener
+
+
 LOG_LEVEL = settings.LOGGING_LEVEL.to_logging_type()
-STREAM_HANDLER = logging.StreamHandler()
-STREAM_HANDLER.setLevel(LOG_LEVEL)
-STREAM_HANDLER.setFormatter(LoggingFormatter())
+HANDLER, LISTENER = create_handler(logging_format=settings.LOGGING_FORMAT)
+if LISTENER is not None:
+    LISTENER.start()
+    # Writes the records still in the queue when the process exits
+    atexit.register(LISTENER.stop)
 
 # unicorn logging handling
 L = logging.getLogger("uvicorn")
 L.handlers.clear()
-L.addHandler(STREAM_HANDLER)
+L.addHandler(HANDLER)
 
 # fastapi logging handling
 L = logging.getLogger("uvicorn.access")
 L.handlers.clear()
-L.addHandler(STREAM_HANDLER)
+L.addHandler(HANDLER)
 
 
 def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(LOG_LEVEL)
-    logger.addHandler(STREAM_HANDLER)
+    logger.addHandler(HANDLER)
     logger.propagate = False
 
     return logger
@@ -0,0 +1,159 @@
+import os
+import time
+from typing import Any
+
+from anyio.to_thread import current_default_thread_limiter
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# prometheus_client reads it from the environment when it's imported, every uvicorn
+# worker then writes its samples to files in it and a scrape adds them together
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# The files are opened when the metrics below are created, processes that
+# import this before startup.sh has prepared the directory would fail without it
+if MULTIPROCESS_DIR_ENV in os.environ:
+    os.makedirs(os.environ[MULTIPROCESS_DIR_ENV], exist_ok=True)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response is sent, per route",
+    ["method", "route", "status_code"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+EXCEPTIONS = Counter(
+    "http_exceptions_total",
+    "Handled exceptions per BaseHTTPException subclass",
+    ["exception", "status_code"],
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections in use",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open above the pool size",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASHER_DURATION = Histogram(
+    "password_hasher_duration_seconds",
+    "Time bcrypt runs for, without the wait for a hasher thread",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5),
+)
+THREADPOOL_THREADS_IN_USE = Gauge(
+    "threadpool_threads_in_use",
+    "Threads running sync routes and dependencies, sampled when a request starts",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_THREADS_LIMIT = Gauge(
+    "threadpool_threads_limit",
+    "Threads available to sync routes and dependencies",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_TASKS_WAITING = Gauge(
+    "threadpool_tasks_waiting",
+    "Sync calls waiting for a free thread, sampled when a request starts",
+    multiprocess_mode="livesum",
+)
+
+
+def is_multiprocess() -> bool:
+    return MULTIPROCESS_DIR_ENV in os.environ
+
+
+def render_metrics() -> bytes:
+    if not is_multiprocess():
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+    return generate_latest(registry)
+
+
+def mark_process_dead() -> None:
+    """Drops the live gauges of the worker, called when it shuts down"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+
+
+def listen_pool_metrics(engine: Engine, *, engine_name: str) -> None:
+    checked_out = POOL_CHECKED_OUT.labels(engine=engine_name)
+    overflow = POOL_OVERFLOW.labels(engine=engine_name)
+
+    def update_overflow() -> None:
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            overflow.set(max(pool.overflow(), 0))
+
+    def on_checkout(*_args: Any) -> None:
+        checked_out.inc()
+        update_overflow()
+
+    def on_checkin(*_args: Any) -> None:
+        checked_out.dec()
+        update_overflow()
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+
+
+def _sample_threadpool() -> None:
+    limiter = current_default_thread_limiter()
+    THREADPOOL_THREADS_IN_USE.set(limiter.borrowed_tokens)
+    THREADPOOL_THREADS_LIMIT.set(limiter.total_tokens)
+    THREADPOOL_TASKS_WAITING.set(limiter.statistics().tasks_waiting)
+
+
+class PrometheusMiddleware:
+    """
+    Records the latency of every request under its route template,
+    requests that match no route share one label to bound the label count
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        _sample_threadpool()
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = scope.get("route")
+            REQUEST_DURATION.labels(
+                method=method,
+                route=getattr(route, "path_format", "unmatched"),
+                status_code=str(status_code),
+            ).observe(time.perf_counter() - start)
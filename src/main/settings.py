@@ -36,18 +36,72 @@ class LoggingLevel(str, Enum):
         return logging_map[self]
 
 
+class LoggingFormat(str, Enum):
+    TEXT = "TEXT"
+    JSON = "JSON"
+
+    @staticmethod
+    def default() -> "LoggingFormat":
+        return LoggingFormat.TEXT
+
+
+class ReplicaSelection(str, Enum):
+    ROUND_ROBIN = "ROUND_ROBIN"
+    LEAST_CONNECTIONS = "LEAST_CONNECTIONS"
+
+    @staticmethod
+    def default() -> "ReplicaSelection":
+        return ReplicaSelection.ROUND_ROBIN
+
+
+class StackCapture(str, Enum):
+    ALWAYS = "ALWAYS"
+    SAMPLED = "SAMPLED"
+    NEVER = "NEVER"
+
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Template"
     API_V1_STR: str = "/api/v1"
     LOGGING_LEVEL: LoggingLevel = LoggingLevel.default()
+    # JSON lines with the request id and route, written from a background thread
+    LOGGING_FORMAT: LoggingFormat = LoggingFormat.default()
     ENVIRONMENT: Environment = Environment.default()
+    # Returns the time spent on DB queries, bcrypt, JWTs and rendering
+    # in a Server-Timing header of every response
+    SERVER_TIMING: bool = False
+    # Bearer token that Prometheus scrapes /metrics with, the route
+    # answers 404 without one so that it isn't exposed by default
+    METRICS_TOKEN: str | None = None
+    # Responses of at least COMPRESSION_MIN_SIZE bytes are compressed with
+    # brotli or gzip, whichever the client accepts. Levels go up to 9 for gzip
+    # and 11 for brotli, higher ones trade CPU time for smaller bodies
+    COMPRESSION: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Whether handled exceptions keep the stack they were raised from for
+    # the error log, per status class. SAMPLED keeps it for a fraction of them,
+    # expected 4xx errors like failed logins rarely need one
+    EXCEPTION_STACK_4XX: StackCapture = StackCapture.SAMPLED
+    EXCEPTION_STACK_5XX: StackCapture = StackCapture.ALWAYS
+    EXCEPTION_STACK_SAMPLE_RATE: float = 0.01
 
     # Used to redirect users to a password recovery page
     FRONTEND_HOST: str = "http://localhost:5173"
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 20
+    # Access tokens carry the user group, active flag and token version,
+    # routes that only check access skip loading the user. A revoked or
+    # disabled user keeps access to them until the token expires
+    ACCESS_TOKEN_STATELESS: bool = False
     # 60 minutes * 24 hours * 7 days = 7 days
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    # Expired refresh tokens deleted per transaction, and how often each
+    # uvicorn worker purges them, 0 leaves it to `python src/db/purge_tokens.py`
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = 1000
+    REFRESH_TOKEN_PURGE_INTERVAL_MINUTES: int = 60
     # 60 minutes * 24 hours = 1 day
     PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 60 * 24
 
@@ -65,30 +119,80 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "app"
     POSTGRES_TEST_DB: str = POSTGRES_DB + "_test"
 
-    @computed_field  # type: ignore[prop-decorator]
-    @property
-    def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
+    def _build_database_uri(self, *, scheme: str, path: str) -> PostgresDsn:
         return PostgresDsn.build(
-            scheme="postgresql",
+            scheme=scheme,
             username=self.POSTGRES_USER,
             password=self.POSTGRES_PASSWORD,
             host=self.POSTGRES_SERVER,
             port=self.POSTGRES_PORT,
-            path=self.POSTGRES_DB,
+            path=path,
         )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
+        return self._build_database_uri(scheme="postgresql", path=self.POSTGRES_DB)
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def SQLALCHEMY_TEST_DATABASE_URI(self) -> PostgresDsn:
-        return PostgresDsn.build(
-            scheme="postgresql",
-            username=self.POSTGRES_USER,
-            password=self.POSTGRES_PASSWORD,
-            host=self.POSTGRES_SERVER,
-            port=self.POSTGRES_PORT,
-            path=self.POSTGRES_TEST_DB,
+        return self._build_database_uri(scheme="postgresql", path=self.POSTGRES_TEST_DB)
+
+    # Same databases as above, reached through the asyncpg driver
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> PostgresDsn:
+        return self._build_database_uri(
+            scheme="postgresql+asyncpg", path=self.POSTGRES_DB
         )
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def SQLALCHEMY_TEST_ASYNC_DATABASE_URI(self) -> PostgresDsn:
+        return self._build_database_uri(
+            scheme="postgresql+asyncpg", path=self.POSTGRES_TEST_DB
+        )
+
+    # Connection pool of each engine, every uvicorn worker has its own pools
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before failing
+    DB_POOL_TIMEOUT: float = 30
+    # Seconds after which a connection is replaced, -1 keeps them indefinitely
+    DB_POOL_RECYCLE: int = -1
+    # Tests connections with a round-trip on every checkout
+    DB_POOL_PRE_PING: bool = False
+    # Statements allowed per request in LOCAL, and how often one statement may
+    # repeat before it's reported as a possible N+1, going over either of them
+    # logs a warning, or fails the request when DB_QUERY_BUDGET_RAISE is set
+    DB_QUERY_BUDGET: int = 15
+    DB_QUERY_REPEAT_LIMIT: int = 3
+    DB_QUERY_BUDGET_RAISE: bool = False
+    # Statements slower than this many milliseconds are logged, 0 turns it off
+    DB_SLOW_QUERY_MS: float = 200
+    # In LOCAL, slow SELECTs are run again on a separate connection
+    # to log their plan from EXPLAIN (ANALYZE, BUFFERS)
+    DB_SLOW_QUERY_EXPLAIN: bool = False
+    # Read replicas for the read-only sessions, every one gets its own pool.
+    # Replicas lagging behind by more than DB_REPLICA_MAX_LAG_SECONDS are
+    # skipped, and reads go to the primary when none of them is left
+    DB_REPLICA_URIS: list[PostgresDsn] = []
+    DB_REPLICA_SELECTION: ReplicaSelection = ReplicaSelection.default()
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5
+
+    # Threads of each uvicorn worker that run bcrypt
+    PASSWORD_HASHER_WORKERS: int = 2
+    # Password operations waiting for a thread, the ones above it get a 503
+    PASSWORD_HASHER_MAX_PENDING: int = 64
+    # Threads of each uvicorn worker that run bcrypt for bulk user imports
+    BULK_PASSWORD_HASHER_WORKERS: int = 2
+
+    # Users cached per uvicorn worker to authenticate requests without a query,
+    # the TTL in seconds bounds how long other workers see a changed user
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL: float = 30
+
     # The system works without sending emails so SMTP values are optional
     SMTP_HOST: str | None = None
     SMTP_USER: str | None = None
@@ -96,6 +200,14 @@ class Settings(BaseSettings):
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
+    # Threads of each uvicorn worker that send emails, each keeps one SMTP connection
+    EMAIL_WORKERS: int = 2
+    # Emails waiting to be sent, the ones above it get a 503
+    EMAIL_MAX_QUEUED: int = 1000
+    # Compiles the email templates at startup instead of on the first email
+    EMAIL_TEMPLATES_PRELOAD: bool = False
+    # Shared by the worker processes, None uses the system temporary directory
+    EMAIL_TEMPLATES_BYTECODE_CACHE_DIR: str | None = None
     TEST_EMAIL_DESTINATION: str
 
     def _check_default_secret(self, *, var_name: str, value: str | None) -> None:
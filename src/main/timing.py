@@ -0,0 +1,124 @@
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestTimings:
+    """Time spent per phase of one request, phases can repeat"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # phase -> (seconds, times entered)
+        self._phases: dict[str, tuple[float, int]] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        # Sync dependencies and routes record from threadpool threads
+        with self._lock:
+            total, count = self._phases.get(phase, (0.0, 0))
+            self._phases[phase] = (total + seconds, count + 1)
+
+    def to_header(self, *, total: float) -> str:
+        with self._lock:
+            phases = dict(self._phases)
+        metrics = [
+            f'{phase};dur={seconds * 1000:.2f};desc="{count}x"'
+            for phase, (seconds, count) in phases.items()
+        ]
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+# Set only while the middleware handles a request, threadpool calls get a copy
+_request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.record(phase, time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn: Any, *_args: Any) -> None:
+    if _request_timings.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, *_args: Any) -> None:
+    starts = conn.info.get("query_start")
+    timings = _request_timings.get()
+    if starts and timings is not None:
+        timings.record("db", time.perf_counter() - starts.pop())
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # Failed queries don't reach after_cursor_execute
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def listen_query_timings(engine: Engine) -> None:
+    """Adds the time of every query to the `db` phase of the current request"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class TimedORJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        with timed("render"):
+            return super().render(content)
+
+
+class ServerTimingMiddleware:
+    """
+    Returns the time each phase of a request took in a Server-Timing header,
+    phases that end after the response starts are not included
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        start = time.perf_counter()
+
+        async def send_with_timings(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    timings.to_header(total=time.perf_counter() - start),
+                )
+            await send(message)
+
+        token = _request_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _request_timings.reset(token)
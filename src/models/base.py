@@ -12,6 +12,14 @@ class IsActiveMixin(SQLModel):
     is_active: bool = True
 
 
+def utc_now() -> dt.datetime:
+    # Columns are stored without a timezone, asyncpg refuses aware datetimes for them
+    return dt.datetime.now(dt.UTC).replace(tzinfo=None)
+
+
 class TimestampMixin(SQLModel):
-    created: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.UTC))
-    updated: dt.datetime = Field(default_factory=lambda: dt.datetime.now(dt.UTC))
+    created: dt.datetime = Field(default_factory=utc_now)
+    # Set on every ORM update, the ETags of rows are built from it
+    updated: dt.datetime = Field(
+        default_factory=utc_now, sa_column_kwargs={"onupdate": utc_now}
+    )
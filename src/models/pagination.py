@@ -0,0 +1,31 @@
+import base64
+import datetime as dt
+import uuid
+
+import orjson
+from pydantic import ValidationError
+from sqlmodel import SQLModel
+
+from src.exceptions.bad_request_400 import InvalidCursor400Exception
+
+
+class PageCursor(SQLModel):
+    """
+    Position after the last row of a page, rows are ordered by (created, id).
+    Clients receive it as an opaque string
+    """
+
+    created: dt.datetime
+    id: uuid.UUID
+
+    def encode(self) -> str:
+        payload = orjson.dumps(self.model_dump(mode="json"))
+        return base64.urlsafe_b64encode(payload).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PageCursor":
+        try:
+            payload = base64.urlsafe_b64decode(cursor.encode())
+            return cls.model_validate(orjson.loads(payload))
+        except (ValueError, ValidationError) as exc:
+            raise InvalidCursor400Exception("Invalid cursor", exc=exc)
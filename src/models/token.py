@@ -1,3 +1,4 @@
+import datetime as dt
 import uuid
 
 from sqlmodel import Field, Relationship, SQLModel
@@ -12,9 +13,12 @@ class RefreshTokenBase(SQLModel):
 
 # DB table
 class RefreshToken(RefreshTokenBase, UuidMixin, table=True):
+    # Indexed for the per-user lookups and the cascade of user deletes
     user_id: uuid.UUID = Field(
-        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
     )
+    # Same expiry as the token itself, naive UTC, lets expired rows be purged
+    expires_at: dt.datetime = Field(index=True)
     user: User = Relationship(back_populates="tokens")
 
 
@@ -34,3 +38,15 @@ class Tokens(RefreshTokenPublic, AccessToken):
 class TokenPayload(SQLModel):
     exp: float
     sub: str
+    # Claims of stateless access tokens, see ACCESS_TOKEN_STATELESS
+    user_group: str | None = None
+    is_active: bool | None = None
+    ver: int | None = None
+
+    @property
+    def is_stateless(self) -> bool:
+        return (
+            self.user_group is not None
+            and self.is_active is not None
+            and self.ver is not None
+        )
@@ -4,6 +4,7 @@ from enum import Enum
 from typing import TYPE_CHECKING
 
 from pydantic import EmailStr
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from src.models.base import IsActiveMixin, TimestampMixin, UuidMixin
@@ -26,12 +27,24 @@ class UserBase(IsActiveMixin):
 
 # DB table
 class User(UserBase, UuidMixin, TimestampMixin, table=True):
+    # Supports keyset pagination, which orders users by (created, id)
+    __table_args__ = (Index("ix_user_created_id", "created", "id"),)
+
     hashed_password: str
+    # Carried by stateless access tokens, bumping it revokes the issued ones
+    token_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     tokens: list["RefreshToken"] = Relationship(
         back_populates="user", cascade_delete=True
     )
 
 
+class Principal(SQLModel):
+    """The caller of a request, as far as authorization needs to know it"""
+
+    id: uuid.UUID
+    user_group: str
+
+
 class UserPublic(UserBase):
     id: uuid.UUID
     created: dt.datetime
@@ -40,12 +53,42 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     users: list[UserPublic]
+    # Passed back as `cursor` to get the next page, None on the last page
+    next_cursor: str | None = None
 
 
 class UserCreate(UserBase):
     password: str = Field(min_length=8, max_length=40)
 
 
+# Bcrypt runs for every user, bigger imports are split over several requests.
+# At around 0.25 s per hash, spread over BULK_PASSWORD_HASHER_WORKERS threads
+BULK_CREATE_MAX_USERS = 250
+
+
+class UsersBulkCreate(SQLModel):
+    users: list[UserCreate] = Field(min_length=1, max_length=BULK_CREATE_MAX_USERS)
+
+
+class BulkCreateStatus(str, Enum):
+    CREATED = "CREATED"
+    DUPLICATE = "DUPLICATE"
+
+
+class UserBulkCreateResult(SQLModel):
+    # Position of the user in the request
+    index: int
+    email: str
+    status: BulkCreateStatus
+    id: uuid.UUID | None = None
+
+
+class UsersBulkCreated(SQLModel):
+    results: list[UserBulkCreateResult]
+    created: int
+    duplicates: int
+
+
 class UserRegister(SQLModel):
     email: EmailStr = Field(max_length=255)
     password: str = Field(min_length=8, max_length=40)
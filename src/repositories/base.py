@@ -1,15 +1,42 @@
 import uuid
 from abc import ABC
-from collections.abc import Sequence
-from typing import Generic, TypeVar
+from collections.abc import Iterator, Sequence
+from typing import Any, Generic, TypeVar
 
+from sqlalchemy import Row, literal, tuple_
+from sqlalchemy import select as sa_select
+from sqlalchemy.orm import class_mapper
 from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 
 from src.models.base import IsActiveMixin, UuidMixin
+from src.models.pagination import PageCursor
 
 ModelType = TypeVar("ModelType", bound=SQLModel)
 UuidModelType = TypeVar("UuidModelType", bound=UuidMixin)
 IsActiveModelType = TypeVar("IsActiveModelType", bound=IsActiveMixin)
+SelectType = TypeVar("SelectType", bound=SQLModel)
+
+# Columns that order rows for keyset pagination, the model needs both of them
+KEYSET_COLUMNS = ("created", "id")
+
+
+def keyset_page(
+    query: SelectOfScalar[SelectType],
+    *,
+    model_type: type[SelectType],
+    cursor: PageCursor | None,
+    limit: int,
+) -> SelectOfScalar[SelectType]:
+    # Seeks straight to the cursor through the (created, id) index,
+    # unlike OFFSET which reads and discards every skipped row
+    columns = class_mapper(model_type).c
+    created, obj_id = (columns[name] for name in KEYSET_COLUMNS)
+    if cursor is not None:
+        position = tuple_(literal(cursor.created), literal(cursor.id))
+        query = query.where(tuple_(created, obj_id) > position)
+    return query.order_by(created, obj_id).limit(limit)
 
 
 class BaseRepository(Generic[ModelType], ABC):
@@ -22,6 +49,33 @@ class BaseRepository(Generic[ModelType], ABC):
         query = select(self._model_type).offset(skip).limit(limit)
         return db.exec(query).all()
 
+    def get_range_after(
+        self, *, db: Session, cursor: PageCursor | None = None, limit: int = 100
+    ) -> Sequence[ModelType]:
+        query = keyset_page(
+            select(self._model_type),
+            model_type=self._model_type,
+            cursor=cursor,
+            limit=limit,
+        )
+        return db.exec(query).all()
+
+    def stream_columns(
+        self, *, db: Session, columns: Sequence[str], batch_size: int = 1000
+    ) -> Iterator[Sequence[Row[Any]]]:
+        """
+        Yields every row in (created, id) order, batch_size rows at a time.
+        The rows are read through a server-side cursor and never become ORM objects,
+        so memory use doesn't grow with the size of the table
+        """
+        table_columns = class_mapper(self._model_type).c
+        query = (
+            sa_select(*(table_columns[name] for name in columns))
+            .order_by(*(table_columns[name] for name in KEYSET_COLUMNS))
+            .execution_options(yield_per=batch_size)
+        )
+        yield from db.connection().execute(query).partitions()
+
     @staticmethod
     def _add_obj(*, db: Session, db_obj: ModelType) -> ModelType:
         db.add(db_obj)
@@ -30,6 +84,9 @@ class BaseRepository(Generic[ModelType], ABC):
 
         return db_obj
 
+    def _invalidate(self, *, db: Session, db_obj: ModelType) -> None:
+        """Drops cached copies of a changed object, the base repository caches nothing"""
+
     @staticmethod
     def remove(*, db: Session, db_obj: ModelType) -> None:
         db.delete(db_obj)
@@ -62,8 +119,18 @@ class BaseIsActiveRepository(BaseRepository[IsActiveModelType], ABC):
         )
         return db.exec(query).all()
 
-    @staticmethod
-    def disable(*, db: Session, db_obj: IsActiveModelType) -> None:
+    def get_active_range_after(
+        self, *, db: Session, cursor: PageCursor | None = None, limit: int = 100
+    ) -> Sequence[IsActiveModelType]:
+        query = keyset_page(
+            select(self._model_type).where(self._model_type.is_active),
+            model_type=self._model_type,
+            cursor=cursor,
+            limit=limit,
+        )
+        return db.exec(query).all()
+
+    def disable(self, *, db: Session, db_obj: IsActiveModelType) -> None:
         obj_data = db_obj.model_dump(exclude_unset=True)
         update = {"is_active": False}
 
@@ -71,3 +138,100 @@ class BaseIsActiveRepository(BaseRepository[IsActiveModelType], ABC):
         db.add(db_obj)
         db.flush()
         db.refresh(db_obj)
+        self._invalidate(db=db, db_obj=db_obj)
+
+
+# === Async repositories, mirror the sync ones above for use with an AsyncSession
+
+
+class AsyncBaseRepository(Generic[ModelType], ABC):
+    def __init__(self, model_type: type[ModelType]) -> None:
+        self._model_type = model_type
+
+    async def get_range(
+        self, *, db: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> Sequence[ModelType]:
+        query = select(self._model_type).offset(skip).limit(limit)
+        result = await db.exec(query)
+        return result.all()
+
+    async def get_range_after(
+        self, *, db: AsyncSession, cursor: PageCursor | None = None, limit: int = 100
+    ) -> Sequence[ModelType]:
+        query = keyset_page(
+            select(self._model_type),
+            model_type=self._model_type,
+            cursor=cursor,
+            limit=limit,
+        )
+        result = await db.exec(query)
+        return result.all()
+
+    @staticmethod
+    async def _add_obj(*, db: AsyncSession, db_obj: ModelType) -> ModelType:
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+
+        return db_obj
+
+    def _invalidate(self, *, db: AsyncSession, db_obj: ModelType) -> None:
+        """Drops cached copies of a changed object, the base repository caches nothing"""
+
+    @staticmethod
+    async def remove(*, db: AsyncSession, db_obj: ModelType) -> None:
+        await db.delete(db_obj)
+        await db.flush()
+
+
+class AsyncBaseUuidRepository(AsyncBaseRepository[UuidModelType], ABC):
+    def __init__(self, model_type: type[UuidModelType]) -> None:
+        self._model_type = model_type
+        super().__init__(model_type)
+
+    async def get_by_id(
+        self, *, db: AsyncSession, obj_id: uuid.UUID
+    ) -> UuidModelType | None:
+        query = select(self._model_type).where(self._model_type.id == obj_id)
+        result = await db.exec(query)
+        return result.first()
+
+
+class AsyncBaseIsActiveRepository(AsyncBaseRepository[IsActiveModelType], ABC):
+    def __init__(self, model_type: type[IsActiveModelType]) -> None:
+        self._model_type = model_type
+        super().__init__(model_type)
+
+    async def get_active_range(
+        self, *, db: AsyncSession, skip: int = 0, limit: int = 100
+    ) -> Sequence[IsActiveModelType]:
+        query = (
+            select(self._model_type)
+            .offset(skip)
+            .limit(limit)
+            .where(self._model_type.is_active)
+        )
+        result = await db.exec(query)
+        return result.all()
+
+    async def get_active_range_after(
+        self, *, db: AsyncSession, cursor: PageCursor | None = None, limit: int = 100
+    ) -> Sequence[IsActiveModelType]:
+        query = keyset_page(
+            select(self._model_type).where(self._model_type.is_active),
+            model_type=self._model_type,
+            cursor=cursor,
+            limit=limit,
+        )
+        result = await db.exec(query)
+        return result.all()
+
+    async def disable(self, *, db: AsyncSession, db_obj: IsActiveModelType) -> None:
+        obj_data = db_obj.model_dump(exclude_unset=True)
+        update = {"is_active": False}
+
+        db_obj.sqlmodel_update(obj_data, update=update)
+        db.add(db_obj)
+        await db.flush()
+        await db.refresh(db_obj)
+        self._invalidate(db=db, db_obj=db_obj)
@@ -0,0 +1,95 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Generic, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, class_mapper, make_transient_to_detached
+
+from src.models.base import UuidMixin
+
+CachedModelType = TypeVar("CachedModelType", bound=UuidMixin)
+
+# Session.info key of the (cache, id) pairs to drop once the session commits
+PENDING_INVALIDATIONS_KEY = "cache_pending_invalidations"
+
+
+class ModelCache(Generic[CachedModelType]):
+    """
+    In-process TTL + LRU cache of database rows keyed by id,
+    every uvicorn worker has its own copy so the TTL bounds
+    how long other workers can serve a stale row
+    """
+
+    def __init__(
+        self, model_type: type[CachedModelType], *, maxsize: int, ttl: float
+    ) -> None:
+        self._model_type = model_type
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # id -> (expires at, column values)
+        self._entries: OrderedDict[uuid.UUID, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._columns = [attr.key for attr in class_mapper(model_type).column_attrs]
+
+    @property
+    def enabled(self) -> bool:
+        return self._maxsize > 0 and self._ttl > 0
+
+    def get(self, obj_id: uuid.UUID) -> CachedModelType | None:
+        """
+        Returns a new detached instance built from the cached values,
+        callers attach it to their session with `Session.merge(obj, load=False)`
+        """
+        with self._lock:
+            entry = self._entries.get(obj_id)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= time.monotonic():
+                del self._entries[obj_id]
+                return None
+            self._entries.move_to_end(obj_id)
+
+        db_obj = self._model_type(**values)
+        # Marks the instance as an already persisted row with no pending changes
+        make_transient_to_detached(db_obj)
+        return db_obj
+
+    def set(self, db_obj: CachedModelType) -> None:
+        if not self.enabled:
+            return
+        # Attribute access loads expired columns, the instance dict could miss them
+        values = {column: getattr(db_obj, column) for column in self._columns}
+        expires_at = time.monotonic() + self._ttl
+        with self._lock:
+            self._entries[db_obj.id] = (expires_at, values)
+            self._entries.move_to_end(db_obj.id)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, obj_id: uuid.UUID) -> None:
+        with self._lock:
+            self._entries.pop(obj_id, None)
+
+    def invalidate_on_commit(self, session: Session, obj_id: uuid.UUID) -> None:
+        """
+        Drops the object now and again after the session commits, a request
+        reading it in between would otherwise cache the uncommitted old row
+        """
+        self.invalidate(obj_id)
+        pending = session.info.setdefault(PENDING_INVALIDATIONS_KEY, [])
+        pending.append((self, obj_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for cache, obj_id in session.info.pop(PENDING_INVALIDATIONS_KEY, []):
+        cache.invalidate(obj_id)
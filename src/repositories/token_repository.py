@@ -1,15 +1,22 @@
+import datetime as dt
 import uuid
 from collections.abc import Sequence
 
-from sqlmodel import Session, select
+from sqlalchemy import delete, func
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.models.token import RefreshToken
-from src.repositories.base import BaseUuidRepository
+from src.repositories.base import AsyncBaseUuidRepository, BaseUuidRepository
 
 
 class TokenRepository(BaseUuidRepository[RefreshToken]):
-    def create_token(self, *, db: Session, token_create: RefreshToken) -> RefreshToken:
-        return self._add_obj(db=db, db_obj=token_create)
+    @staticmethod
+    def create_token(*, db: Session, token_create: RefreshToken) -> RefreshToken:
+        # Every column is set by the app, no refresh SELECT is needed after the INSERT
+        db.add(token_create)
+        db.flush()
+        return token_create
 
     @staticmethod
     def get_by_token(*, db: Session, token: str) -> RefreshToken | None:
@@ -21,5 +28,98 @@ class TokenRepository(BaseUuidRepository[RefreshToken]):
         query = select(RefreshToken).where(RefreshToken.user_id == user_id)
         return db.exec(query).all()
 
+    @staticmethod
+    def count_by_user_id(*, db: Session, user_id: uuid.UUID) -> int:
+        query = (
+            select(func.count())
+            .select_from(RefreshToken)
+            .where(RefreshToken.user_id == user_id)
+        )
+        return db.exec(query).one()
+
+    @staticmethod
+    def delete_by_user_id(*, db: Session, user_id: uuid.UUID) -> int:
+        query = delete(RefreshToken).where(col(RefreshToken.user_id) == user_id)
+        return db.connection().execute(query).rowcount
+
+    @staticmethod
+    def delete_by_token(*, db: Session, token: str) -> RefreshToken | None:
+        # Looks up and removes the token in one DELETE ... RETURNING round-trip
+        query = (
+            delete(RefreshToken)
+            .where(col(RefreshToken.refresh_token) == token)
+            .returning(RefreshToken)
+        )
+        return db.scalars(query).one_or_none()
+
+    @staticmethod
+    def delete_expired_batch(*, db: Session, now: dt.datetime, batch_size: int) -> int:
+        # Bounded batches keep every transaction and its row locks short,
+        # rows locked by a concurrent purge are skipped instead of waited for
+        expired_ids = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at < now)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        query = delete(RefreshToken).where(col(RefreshToken.id).in_(expired_ids))
+        return db.connection().execute(query).rowcount
+
 
 token_repository = TokenRepository(RefreshToken)
+
+
+class AsyncTokenRepository(AsyncBaseUuidRepository[RefreshToken]):
+    @staticmethod
+    async def create_token(
+        *, db: AsyncSession, token_create: RefreshToken
+    ) -> RefreshToken:
+        # Every column is set by the app, no refresh SELECT is needed after the INSERT
+        db.add(token_create)
+        await db.flush()
+        return token_create
+
+    @staticmethod
+    async def get_by_token(*, db: AsyncSession, token: str) -> RefreshToken | None:
+        query = select(RefreshToken).where(RefreshToken.refresh_token == token)
+        result = await db.exec(query)
+        return result.first()
+
+    @staticmethod
+    async def get_by_user_id(
+        *, db: AsyncSession, user_id: uuid.UUID
+    ) -> Sequence[RefreshToken]:
+        query = select(RefreshToken).where(RefreshToken.user_id == user_id)
+        result = await db.exec(query)
+        return result.all()
+
+    @staticmethod
+    async def count_by_user_id(*, db: AsyncSession, user_id: uuid.UUID) -> int:
+        query = (
+            select(func.count())
+            .select_from(RefreshToken)
+            .where(RefreshToken.user_id == user_id)
+        )
+        result = await db.exec(query)
+        return result.one()
+
+    @staticmethod
+    async def delete_by_user_id(*, db: AsyncSession, user_id: uuid.UUID) -> int:
+        query = delete(RefreshToken).where(col(RefreshToken.user_id) == user_id)
+        connection = await db.connection()
+        result = await connection.execute(query)
+        return result.rowcount
+
+    @staticmethod
+    async def delete_by_token(*, db: AsyncSession, token: str) -> RefreshToken | None:
+        # Looks up and removes the token in one DELETE ... RETURNING round-trip
+        query = (
+            delete(RefreshToken)
+            .where(col(RefreshToken.refresh_token) == token)
+            .returning(RefreshToken)
+        )
+        result = await db.scalars(query)
+        return result.one_or_none()
+
+
+async_token_repository = AsyncTokenRepository(RefreshToken)
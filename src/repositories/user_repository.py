@@ -1,8 +1,54 @@
-from sqlmodel import Session, select
+import uuid
+from collections.abc import Sequence
+from itertools import batched
+from typing import Any
+
+from sqlalchemy import Update, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.auth.oauth import OAuth
-from src.models.user import User, UserCreate, UserUpdate
-from src.repositories.base import BaseIsActiveRepository, BaseUuidRepository
+from src.main.settings import settings
+from src.models.user import (
+    BulkCreateStatus,
+    User,
+    UserBulkCreateResult,
+    UserCreate,
+    UserUpdate,
+)
+from src.repositories.base import (
+    AsyncBaseIsActiveRepository,
+    AsyncBaseUuidRepository,
+    BaseIsActiveRepository,
+    BaseUuidRepository,
+)
+from src.repositories.cache import ModelCache
+
+# Rows per INSERT statement, stays well below the 65535 bind parameters limit
+BULK_INSERT_BATCH_SIZE = 1000
+
+# Changes that revoke the stateless access tokens issued before them
+TOKEN_VERSION_FIELDS = {"password", "user_group", "is_active"}
+
+
+def _token_version_bump(user_id: uuid.UUID) -> Update:
+    # Incremented in SQL, the user it's done for can be a cached copy
+    # holding an old version, writing that plus one could repeat a version
+    return (
+        update(User)
+        .where(col(User.id) == user_id)
+        .values(token_version=col(User.token_version) + 1)
+    )
+
+
+# Users loaded to authenticate requests, shared by the sync and async repositories.
+# The hashed password is kept, the cached user is the CurrentUser that
+# /users/me/password checks the current password against. Entries live
+# only in the worker's memory and are never serialized or sent out
+user_cache = ModelCache(
+    User, maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL
+)
 
 
 class UserRepository(BaseUuidRepository[User], BaseIsActiveRepository[User]):
@@ -18,16 +64,111 @@ class UserRepository(BaseUuidRepository[User], BaseIsActiveRepository[User]):
 
         return self._add_obj(db=db, db_obj=db_obj)
 
+    def bulk_create(
+        self, *, db: Session, users_create: Sequence[UserCreate]
+    ) -> list[UserBulkCreateResult]:
+        """
+        Creates the users with multi-row INSERT ... ON CONFLICT DO NOTHING statements.
+        Emails that already exist, or repeat within users_create, are reported
+        as duplicates and their passwords are never hashed.
+        Ends the session's transaction before hashing, so that no connection is
+        held while bcrypt runs, the session must have no pending changes
+        """
+        results: list[UserBulkCreateResult] = [
+            UserBulkCreateResult(
+                index=index, email=user.email, status=BulkCreateStatus.DUPLICATE
+            )
+            for index, user in enumerate(users_create)
+        ]
+        # Email -> index of its first occurrence
+        first_indexes: dict[str, int] = {}
+        for index, user in enumerate(users_create):
+            first_indexes.setdefault(user.email, index)
+
+        existing_emails = set(
+            db.exec(select(User.email).where(col(User.email).in_(first_indexes))).all()
+        )
+        new_indexes = [
+            index
+            for email, index in first_indexes.items()
+            if email not in existing_emails
+        ]
+        # Nothing is written before this, rolling back ends the read transaction.
+        # Concurrent inserts in the meantime are skipped by ON CONFLICT below
+        db.rollback()
+
+        password_hashes = OAuth.get_password_hashes(
+            passwords=[users_create[index].password for index in new_indexes]
+        )
+        rows = [
+            User.model_validate(
+                users_create[index], update={"hashed_password": password_hash}
+            ).model_dump()
+            for index, password_hash in zip(new_indexes, password_hashes, strict=True)
+        ]
+
+        created_ids: dict[str, uuid.UUID] = {}
+        for batch in batched(rows, BULK_INSERT_BATCH_SIZE):
+            query = (
+                insert(User)
+                .values(batch)
+                # Rows inserted concurrently since the check above are skipped
+                .on_conflict_do_nothing(index_elements=[col(User.email)])
+                .returning(col(User.email), col(User.id))
+            )
+            created_ids.update(db.connection().execute(query).tuples().all())
+
+        for email, user_id in created_ids.items():
+            result = results[first_indexes[email]]
+            result.status = BulkCreateStatus.CREATED
+            result.id = user_id
+        return results
+
     def update_user(self, *, db: Session, db_user: User, user_in: UserUpdate) -> User:
         user_data = user_in.model_dump(exclude_unset=True)
-        update = {}
+        update: dict[str, Any] = {}
         if "password" in user_data:
             password = user_data["password"]
             password_hash = OAuth.get_password_hash(password=password)
             update["hashed_password"] = password_hash
 
         db_user.sqlmodel_update(user_data, update=update)
-        return self._add_obj(db=db, db_obj=db_user)
+        db_user = self._add_obj(db=db, db_obj=db_user)
+        if TOKEN_VERSION_FIELDS & user_data.keys():
+            self._bump_token_version(db=db, db_user=db_user)
+        self._invalidate(db=db, db_obj=db_user)
+        return db_user
+
+    def disable(self, *, db: Session, db_obj: User) -> None:
+        super().disable(db=db, db_obj=db_obj)
+        self._bump_token_version(db=db, db_user=db_obj)
+        self._invalidate(db=db, db_obj=db_obj)
+
+    @staticmethod
+    def _bump_token_version(*, db: Session, db_user: User) -> None:
+        # Run after the flush, so the old version held by db_user isn't written back
+        db.connection().execute(_token_version_bump(db_user.id))
+        db.refresh(db_user)
+
+    def get_by_id_cached(self, *, db: Session, obj_id: uuid.UUID) -> User | None:
+        cached_user = user_cache.get(obj_id)
+        if cached_user is not None:
+            # Attaches the cached row to the session without a SELECT
+            return db.merge(cached_user, load=False)
+
+        db_user = self.get_by_id(db=db, obj_id=obj_id)
+        if db_user is not None:
+            user_cache.set(db_user)
+        return db_user
+
+    def reload_cached(self, *, db: Session, db_user: User) -> User:
+        """Reloads a user whose cached copy can be stale, and caches it again"""
+        db.refresh(db_user)
+        user_cache.set(db_user)
+        return db_user
+
+    def _invalidate(self, *, db: Session, db_obj: User) -> None:
+        user_cache.invalidate_on_commit(db, db_obj.id)
 
     @staticmethod
     def get_by_email(*, db: Session, email: str) -> User | None:
@@ -36,3 +177,77 @@ class UserRepository(BaseUuidRepository[User], BaseIsActiveRepository[User]):
 
 
 user_repository = UserRepository(User)
+
+
+class AsyncUserRepository(
+    AsyncBaseUuidRepository[User], AsyncBaseIsActiveRepository[User]
+):
+    async def create_user(self, *, db: AsyncSession, user_create: UserCreate) -> User:
+        password_hash = await OAuth.get_password_hash_async(
+            password=user_create.password
+        )
+        db_obj = User.model_validate(
+            user_create, update={"hashed_password": password_hash}
+        )
+
+        return await self._add_obj(db=db, db_obj=db_obj)
+
+    async def update_user(
+        self, *, db: AsyncSession, db_user: User, user_in: UserUpdate
+    ) -> User:
+        user_data = user_in.model_dump(exclude_unset=True)
+        update: dict[str, Any] = {}
+        if "password" in user_data:
+            password = user_data["password"]
+            password_hash = await OAuth.get_password_hash_async(password=password)
+            update["hashed_password"] = password_hash
+
+        db_user.sqlmodel_update(user_data, update=update)
+        db_user = await self._add_obj(db=db, db_obj=db_user)
+        if TOKEN_VERSION_FIELDS & user_data.keys():
+            await self._bump_token_version(db=db, db_user=db_user)
+        self._invalidate(db=db, db_obj=db_user)
+        return db_user
+
+    async def disable(self, *, db: AsyncSession, db_obj: User) -> None:
+        await super().disable(db=db, db_obj=db_obj)
+        await self._bump_token_version(db=db, db_user=db_obj)
+        self._invalidate(db=db, db_obj=db_obj)
+
+    @staticmethod
+    async def _bump_token_version(*, db: AsyncSession, db_user: User) -> None:
+        # Run after the flush, so the old version held by db_user isn't written back
+        connection = await db.connection()
+        await connection.execute(_token_version_bump(db_user.id))
+        await db.refresh(db_user)
+
+    async def get_by_id_cached(
+        self, *, db: AsyncSession, obj_id: uuid.UUID
+    ) -> User | None:
+        cached_user = user_cache.get(obj_id)
+        if cached_user is not None:
+            # Attaches the cached row to the session without a SELECT
+            return await db.merge(cached_user, load=False)
+
+        db_user = await self.get_by_id(db=db, obj_id=obj_id)
+        if db_user is not None:
+            user_cache.set(db_user)
+        return db_user
+
+    async def reload_cached(self, *, db: AsyncSession, db_user: User) -> User:
+        """Reloads a user whose cached copy can be stale, and caches it again"""
+        await db.refresh(db_user)
+        user_cache.set(db_user)
+        return db_user
+
+    def _invalidate(self, *, db: AsyncSession, db_obj: User) -> None:
+        user_cache.invalidate_on_commit(db.sync_session, db_obj.id)
+
+    @staticmethod
+    async def get_by_email(*, db: AsyncSession, email: str) -> User | None:
+        query = select(User).where(User.email == email)
+        result = await db.exec(query)
+        return result.first()
+
+
+async_user_repository = AsyncUserRepository(User)
@@ -0,0 +1,63 @@
+import csv
+import io
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from sqlalchemy import Row
+from sqlmodel import Session
+
+from src.models.export import ExportFormat
+from src.models.user import UserPublic
+from src.repositories.user_repository import user_repository
+
+# Rows fetched from the server-side cursor and written out per chunk
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = list(UserPublic.model_fields)
+
+
+class UserExportService:
+    @staticmethod
+    def _to_ndjson(rows: Sequence[Row[Any]]) -> bytes:
+        lines = (
+            UserPublic.model_validate(row._mapping).model_dump_json() for row in rows
+        )
+        return "".join(f"{line}\n" for line in lines).encode()
+
+    @staticmethod
+    def _to_csv_header() -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_COLUMNS)
+        return buffer.getvalue().encode()
+
+    @staticmethod
+    def _to_csv(rows: Sequence[Row[Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            user = UserPublic.model_validate(row._mapping)
+            writer.writerow(user.model_dump(mode="json").values())
+        return buffer.getvalue().encode()
+
+    @classmethod
+    def stream_users(
+        cls, *, db: Session, export_format: ExportFormat
+    ) -> Iterator[bytes]:
+        # FastAPI closes the session dependency before a streamed body is sent,
+        # the closed session then begins a new transaction which is ended here
+        owns_transaction = not db.in_transaction()
+        try:
+            if export_format == ExportFormat.CSV:
+                yield cls._to_csv_header()
+            to_chunk = (
+                cls._to_csv if export_format == ExportFormat.CSV else cls._to_ndjson
+            )
+            for rows in user_repository.stream_columns(
+                db=db, columns=EXPORT_COLUMNS, batch_size=EXPORT_BATCH_SIZE
+            ):
+                yield to_chunk(rows)
+        finally:
+            if owns_transaction:
+                db.close()
+
+
+user_export_service = UserExportService()
@@ -1,11 +1,12 @@
 import uuid
 
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.exceptions.bad_request_400 import InactiveUser400Exception
 from src.exceptions.not_found_404 import UserNotFound404Exception
 from src.models.user import User
-from src.repositories.user_repository import user_repository
+from src.repositories.user_repository import async_user_repository, user_repository
 
 
 class UserService:
@@ -31,6 +32,17 @@ class UserService:
         user_db = cls.get_user_by_id(db=db, user_id=user_id)
         return cls._validate_user_is_active(user_db=user_db)
 
+    @classmethod
+    def get_cached_active_user_by_id(cls, *, db: Session, user_id: uuid.UUID) -> User:
+        user_db = user_repository.get_by_id_cached(db=db, obj_id=user_id)
+        user_db = cls._validate_user_exists(user_db=user_db)
+        return cls._validate_user_is_active(user_db=user_db)
+
+    @classmethod
+    def reload_cached_active_user(cls, *, db: Session, user_db: User) -> User:
+        user_db = user_repository.reload_cached(db=db, db_user=user_db)
+        return cls._validate_user_is_active(user_db=user_db)
+
     @classmethod
     def get_user_by_email(cls, *, db: Session, user_email: str) -> User:
         user_db = user_repository.get_by_email(db=db, email=user_email)
@@ -43,3 +55,29 @@ class UserService:
 
 
 user_service = UserService()
+
+
+class AsyncUserService:
+    """Mirrors the UserService lookups that the event loop routes need"""
+
+    @staticmethod
+    async def get_active_user_by_id(*, db: AsyncSession, user_id: uuid.UUID) -> User:
+        user_db = await async_user_repository.get_by_id(db=db, obj_id=user_id)
+        user_db = UserService._validate_user_exists(user_db=user_db)
+        return UserService._validate_user_is_active(user_db=user_db)
+
+    @staticmethod
+    async def get_cached_active_user_by_id(
+        *, db: AsyncSession, user_id: uuid.UUID
+    ) -> User:
+        user_db = await async_user_repository.get_by_id_cached(db=db, obj_id=user_id)
+        user_db = UserService._validate_user_exists(user_db=user_db)
+        return UserService._validate_user_is_active(user_db=user_db)
+
+    @staticmethod
+    async def reload_cached_active_user(*, db: AsyncSession, user_db: User) -> User:
+        user_db = await async_user_repository.reload_cached(db=db, db_user=user_db)
+        return UserService._validate_user_is_active(user_db=user_db)
+
+
+async_user_service = AsyncUserService()
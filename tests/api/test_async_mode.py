@@ -0,0 +1,119 @@
+import httpx
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.oauth import OAuth
+from src.main.settings import settings
+from src.models.token import Tokens
+from src.models.user import User, UserCreate, UserGroup, UserPublic, UsersPublic
+from src.repositories.token_repository import async_token_repository
+from src.repositories.user_repository import async_user_repository
+from tests.utils.random import RandomStrings
+
+pytestmark = pytest.mark.anyio
+
+API_ASYNC_STR = f"{settings.API_V1_STR}/async"
+
+
+async def _create_user(
+    *, async_db: AsyncSession, password: str, user_group: UserGroup = UserGroup.USER
+) -> User:
+    user_create = UserCreate(
+        email=RandomStrings.random_email(),
+        password=password,
+        user_group=user_group.value,
+    )
+    return await async_user_repository.create_user(db=async_db, user_create=user_create)
+
+
+async def test_async_login_and_refresh(
+    async_client: httpx.AsyncClient, async_db: AsyncSession
+) -> None:
+    password = RandomStrings.random_string()
+    user = await _create_user(async_db=async_db, password=password)
+
+    data = {"username": user.email, "password": password}
+    response = await async_client.post(f"{API_ASYNC_STR}/login", data=data)
+    assert response.status_code == 200
+    tokens = Tokens.model_validate(response.json())
+
+    headers = {"x-token": tokens.refresh_token}
+    response = await async_client.post(f"{API_ASYNC_STR}/refresh", headers=headers)
+    assert response.status_code == 200
+    assert (
+        await async_token_repository.count_by_user_id(db=async_db, user_id=user.id) == 1
+    )
+
+    # The refresh token was replaced, using it again revokes every token
+    response = await async_client.post(f"{API_ASYNC_STR}/refresh", headers=headers)
+    assert response.status_code == 403
+    assert (
+        await async_token_repository.count_by_user_id(db=async_db, user_id=user.id) == 0
+    )
+
+
+async def test_async_login_incorrect_password(
+    async_client: httpx.AsyncClient, async_db: AsyncSession
+) -> None:
+    user = await _create_user(async_db=async_db, password=RandomStrings.random_string())
+
+    data = {"username": user.email, "password": RandomStrings.random_string()}
+    response = await async_client.post(f"{API_ASYNC_STR}/login", data=data)
+    assert response.status_code == 400
+
+
+async def test_async_get_me(
+    async_client: httpx.AsyncClient, async_db: AsyncSession
+) -> None:
+    user = await _create_user(async_db=async_db, password=RandomStrings.random_string())
+    access_token = OAuth.create_access_token(subject=str(user.id))
+
+    response = await async_client.get(
+        f"{API_ASYNC_STR}/users/me",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+    assert UserPublic.model_validate(response.json()).id == user.id
+
+
+async def test_async_get_users(
+    async_client: httpx.AsyncClient, async_db: AsyncSession
+) -> None:
+    password = RandomStrings.random_string()
+    admin = await _create_user(
+        async_db=async_db, password=password, user_group=UserGroup.ADMIN
+    )
+    user = await _create_user(async_db=async_db, password=password)
+
+    admin_token = OAuth.create_access_token(subject=str(admin.id))
+    response = await async_client.get(
+        f"{API_ASYNC_STR}/users/",
+        headers={"Authorization": f"Bearer {admin_token}"},
+    )
+    assert response.status_code == 200
+    users = UsersPublic.model_validate(response.json()).users
+    assert {admin.id, user.id} <= {public_user.id for public_user in users}
+
+    user_token = OAuth.create_access_token(subject=str(user.id))
+    response = await async_client.get(
+        f"{API_ASYNC_STR}/users/",
+        headers={"Authorization": f"Bearer {user_token}"},
+    )
+    assert response.status_code == 403
+
+
+async def test_async_signup(
+    async_client: httpx.AsyncClient, async_db: AsyncSession
+) -> None:
+    data = {
+        "email": RandomStrings.random_email(),
+        "password": RandomStrings.random_string(),
+    }
+    response = await async_client.post(f"{API_ASYNC_STR}/users/signup", json=data)
+    assert response.status_code == 200
+
+    user_db = await async_user_repository.get_by_email(db=async_db, email=data["email"])
+    assert user_db is not None
+
+    response = await async_client.post(f"{API_ASYNC_STR}/users/signup", json=data)
+    assert response.status_code == 400
@@ -8,3 +8,16 @@ def test_system_health(client: TestClient) -> None:
     assert response.status_code == 200
     content = response.json()
     assert content["is_healthy"]
+
+
+def test_db_pool_stats(client_admin: TestClient) -> None:
+    response = client_admin.get(f"{settings.API_V1_STR}/health/db-pool")
+    assert response.status_code == 200
+    content = response.json()
+    assert content["engine"]["pool_size"] == settings.DB_POOL_SIZE
+    assert content["engine"]["checkout_timeouts"] == 0
+
+
+def test_db_pool_stats_as_user(client_user: TestClient) -> None:
+    response = client_user.get(f"{settings.API_V1_STR}/health/db-pool")
+    assert response.status_code == 403
@@ -1,14 +1,18 @@
+import datetime as dt
 import uuid
 
+import pytest
 from sqlmodel import Session
 from starlette.testclient import TestClient
 
 from src.auth.oauth import OAuth
 from src.main.settings import settings
 from src.models.user import PasswordReset
+from src.repositories.token_repository import token_repository
 from src.repositories.user_repository import user_repository
 from tests.factories.token import TokenFactory
 from tests.factories.user import UserFactory
+from tests.fixtures.queries import MaxQueries
 from tests.utils.random import RandomStrings
 from tests.validators.token import TokenValidator
 
@@ -33,6 +37,61 @@ def test_user_login(client: TestClient, db: Session) -> None:
     )
     TokenValidator.validate_refresh_token_amount(db=db, amount=1)
 
+    token_db = token_repository.get_by_token(db=db, token=refresh_token)
+    assert token_db is not None
+    token_payload = OAuth.validate_user_token(
+        token=refresh_token, secret_key=settings.AUTH_REFRESH_TOKEN_KEY
+    )
+    # The stored expiry matches the one inside the token
+    assert token_db.expires_at.replace(tzinfo=dt.UTC).timestamp() == pytest.approx(
+        token_payload.exp, abs=1
+    )
+
+
+def test_user_login_twice_in_a_second(client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    data = {"username": user_params.email, "password": user_params.password}
+
+    refresh_tokens = []
+    for _ in range(2):
+        response = client.post(f"{settings.API_V1_STR}/login", data=data)
+        assert response.status_code == 200
+        refresh_tokens.append(response.json()["refresh_token"])
+
+    # Tokens with the same expiry are told apart by their id
+    assert refresh_tokens[0] != refresh_tokens[1]
+    TokenValidator.validate_refresh_token_amount(db=db, amount=2)
+
+
+@pytest.mark.usefixtures("stateless_tokens")
+def test_user_login_stateless(client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    data = {"username": user_params.email, "password": user_params.password}
+    response = client.post(f"{settings.API_V1_STR}/login", data=data)
+    assert response.status_code == 200
+
+    token_payload = OAuth.validate_user_token(
+        token=response.json()["access_token"],
+        secret_key=settings.AUTH_ACCESS_TOKEN_KEY,
+    )
+    assert token_payload.is_stateless
+    assert token_payload.user_group == user_params.user.user_group
+    assert token_payload.is_active
+    assert token_payload.ver == user_params.user.token_version
+
+
+def test_user_login_without_claims(client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    data = {"username": user_params.email, "password": user_params.password}
+    response = client.post(f"{settings.API_V1_STR}/login", data=data)
+    assert response.status_code == 200
+
+    token_payload = OAuth.validate_user_token(
+        token=response.json()["access_token"],
+        secret_key=settings.AUTH_ACCESS_TOKEN_KEY,
+    )
+    assert not token_payload.is_stateless
+
 
 def test_user_wrong_email(client: TestClient, db: Session) -> None:
     user_params = UserFactory.create_random_user(db=db)
@@ -65,6 +124,23 @@ def test_user_refresh_token_invalidation_login(client: TestClient, db: Session)
     TokenValidator.validate_refresh_token_amount(db=db, amount=1)
 
 
+def test_user_login_token_queries(
+    client: TestClient, db: Session, assert_max_queries: MaxQueries
+) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    for minutes in range(20):
+        TokenFactory.create_refresh_token(
+            db=db, user_id=user_params.user.id, delta_minutes=10 + minutes
+        )
+
+    # The user, then count, delete and insert, however many tokens the user had
+    with assert_max_queries(4):
+        data = {"username": user_params.email, "password": user_params.password}
+        response = client.post(f"{settings.API_V1_STR}/login", data=data)
+    assert response.status_code == 200
+    TokenValidator.validate_refresh_token_amount(db=db, amount=1)
+
+
 def test_user_token_refresh(client: TestClient, db: Session) -> None:
     user_params = UserFactory.create_random_user(db=db)
 
@@ -154,6 +230,7 @@ def test_user_reset_password(client: TestClient, db: Session) -> None:
     assert response.status_code == 200
 
     user_db = user_repository.get_by_id(db=db, obj_id=user_params.user.id)
+    assert user_db is not None
     assert OAuth.verify_password(
         password=new_password, hashed_password=user_db.hashed_password
     )
@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from src.main.settings import settings
+from tests.factories.user import UserFactory
+
+METRICS_TOKEN = "test-metrics-token"
+
+
+@pytest.fixture(autouse=True)
+def metrics_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "METRICS_TOKEN", METRICS_TOKEN)
+
+
+def _get_samples(client: TestClient) -> dict[str, list[dict[str, str]]]:
+    response = client.get(
+        f"{settings.API_V1_STR}/metrics",
+        headers={"Authorization": f"Bearer {METRICS_TOKEN}"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    samples: dict[str, list[dict[str, str]]] = {}
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            samples.setdefault(sample.name, []).append(sample.labels)
+    return samples
+
+
+def test_get_metrics_disabled(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    response = client.get(
+        f"{settings.API_V1_STR}/metrics",
+        headers={"Authorization": f"Bearer {METRICS_TOKEN}"},
+    )
+    assert response.status_code == 404
+
+
+def test_get_metrics_invalid_token(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/metrics")
+    assert response.status_code == 403
+
+    response = client.get(
+        f"{settings.API_V1_STR}/metrics", headers={"Authorization": "Bearer wrong"}
+    )
+    assert response.status_code == 403
+
+
+def test_get_metrics_request_latency(client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    data = {"username": user_params.email, "password": user_params.password}
+    response = client.post(f"{settings.API_V1_STR}/login", data=data)
+    assert response.status_code == 200
+
+    samples = _get_samples(client)
+    assert {
+        "method": "POST",
+        "route": f"{settings.API_V1_STR}/login",
+        "status_code": "200",
+    } in samples["http_request_duration_seconds_count"]
+    assert {"operation": "verify"} in samples["password_hasher_duration_seconds_count"]
+    assert {"method": "GET"} in samples["http_requests_in_progress"]
+    assert "threadpool_threads_limit" in samples
+
+
+def test_get_metrics_unmatched_route(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/users/not/a/route")
+    assert response.status_code == 404
+
+    samples = _get_samples(client)
+    assert {
+        "method": "GET",
+        "route": "unmatched",
+        "status_code": "404",
+    } in samples["http_request_duration_seconds_count"]
+
+
+def test_get_metrics_exceptions(client: TestClient) -> None:
+    headers = {"Authorization": "Bearer invalid"}
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert response.status_code == 403
+
+    samples = _get_samples(client)
+    assert {
+        "exception": "InvalidToken403Exception",
+        "status_code": "403",
+    } in samples["http_exceptions_total"]
+
+
+def test_get_metrics_db_pool(client: TestClient) -> None:
+    samples = _get_samples(client)
+    assert {"engine": "sync"} in samples["db_pool_checked_out"]
+    assert {"engine": "async"} in samples["db_pool_overflow"]
+
+
+def test_import_metrics_without_multiprocess_dir(tmp_path: Path) -> None:
+    multiprocess_dir = tmp_path / "prometheus"
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(multiprocess_dir)}
+    result = subprocess.run(
+        [sys.executable, "-c", "import src.main.metrics"],
+        cwd=Path(__file__).parents[2],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert any(multiprocess_dir.iterdir())
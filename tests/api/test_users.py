@@ -1,30 +1,42 @@
+import csv
+import io
+
+import pytest
+from sqlalchemy import text
 from sqlmodel import Session
 from starlette.testclient import TestClient
 
 from src.auth.oauth import OAuth
 from src.main.settings import settings
 from src.models.user import (
+    BulkCreateStatus,
     User,
     UserCreate,
     UserGroup,
     UserPublic,
     UserRegister,
+    UsersBulkCreated,
     UserUpdate,
     UserUpdatePassword,
 )
-from src.repositories.user_repository import user_repository
+from src.repositories.user_repository import user_cache, user_repository
 from tests.factories.user import UserFactory
+from tests.fixtures.queries import MaxQueries
 from tests.utils.random import RandomStrings
 from tests.validators.user import UserValidator
 
 
-def test_get_all_users(client_admin: TestClient, db: Session) -> None:
+def test_get_all_users(
+    client_admin: TestClient, db: Session, assert_max_queries: MaxQueries
+) -> None:
     user_list_db: list[User] = []
     for _ in range(3):
         user_params = UserFactory.create_random_user(db=db)
         user_list_db.append(user_params.user)
 
-    response = client_admin.get(f"{settings.API_V1_STR}/users")
+    # The admin and the page of users
+    with assert_max_queries(2):
+        response = client_admin.get(f"{settings.API_V1_STR}/users")
     assert response.status_code == 200
 
     content = response.json()
@@ -48,6 +60,74 @@ def test_get_2_users(client_admin: TestClient, db: Session) -> None:
     assert len(user_list_public) == 2
 
 
+def test_get_users_by_cursor(client_admin: TestClient, db: Session) -> None:
+    for _ in range(3):
+        UserFactory.create_random_user(db=db)
+
+    user_ids: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    for _ in range(2):
+        response = client_admin.get(f"{settings.API_V1_STR}/users", params=params)
+        assert response.status_code == 200
+
+        content = response.json()
+        user_ids.extend(user["id"] for user in content["users"])
+        params["cursor"] = content["next_cursor"]
+
+    admin_user = 1
+    assert len(set(user_ids)) == 3 + admin_user
+
+    response = client_admin.get(f"{settings.API_V1_STR}/users", params=params)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["users"] == []
+    assert content["next_cursor"] is None
+
+
+def test_get_users_invalid_cursor(client_admin: TestClient) -> None:
+    params = {"cursor": "invalid"}
+    response = client_admin.get(f"{settings.API_V1_STR}/users", params=params)
+    assert response.status_code == 400
+
+
+def test_export_users_ndjson(client_admin: TestClient, db: Session) -> None:
+    for _ in range(3):
+        UserFactory.create_random_user(db=db)
+
+    response = client_admin.get(f"{settings.API_V1_STR}/users/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    lines = response.text.splitlines()
+    admin_user = 1
+    assert len(lines) == 3 + admin_user
+    for line in lines:
+        user = UserPublic.model_validate_json(line)
+        assert user_repository.get_by_id(db=db, obj_id=user.id) is not None
+        assert "hashed_password" not in line
+
+
+def test_export_users_csv(client_admin: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+
+    response = client_admin.get(
+        f"{settings.API_V1_STR}/users/export", params={"format": "csv"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == list(UserPublic.model_fields)
+    admin_user = 1
+    assert len(rows) == 1 + admin_user
+    assert user_params.email in {row["email"] for row in rows}
+
+
+def test_export_users_as_user(client_user: TestClient) -> None:
+    response = client_user.get(f"{settings.API_V1_STR}/users/export")
+    assert response.status_code == 403
+
+
 def test_create_user(client_admin: TestClient, db: Session) -> None:
     user_create = UserCreate(
         email=RandomStrings.random_email(),
@@ -78,6 +158,57 @@ def test_create_user_with_existing_email(client_admin: TestClient, db: Session)
     )  # existing user + admin user = 2
 
 
+def test_bulk_create_users(client_admin: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    # Committed like rows of earlier requests, the bulk create rolls back
+    # its read transaction before hashing
+    db.commit()
+    new_email = RandomStrings.random_email()
+    users_create = [
+        UserCreate(email=new_email, password=RandomStrings.random_string()),
+        UserCreate(email=user_params.email, password=RandomStrings.random_string()),
+        UserCreate(email=new_email, password=RandomStrings.random_string()),
+    ]
+    json = {"users": [user.model_dump(exclude_unset=True) for user in users_create]}
+    response = client_admin.post(f"{settings.API_V1_STR}/users/bulk", json=json)
+    assert response.status_code == 200
+
+    content = UsersBulkCreated.model_validate(response.json())
+    assert content.created == 1
+    assert content.duplicates == 2
+    statuses = [result.status for result in content.results]
+    assert statuses == [
+        BulkCreateStatus.CREATED,
+        BulkCreateStatus.DUPLICATE,
+        BulkCreateStatus.DUPLICATE,
+    ]
+
+    user_db = user_repository.get_by_email(db=db, email=new_email)
+    assert user_db is not None
+    assert user_db.id == content.results[0].id
+    assert OAuth.verify_password(
+        password=users_create[0].password, hashed_password=user_db.hashed_password
+    )
+    # created user + existing user + admin user = 3
+    UserValidator.validate_user_amount(db=db, amount=3)
+
+
+def test_bulk_create_users_invalid_row(client_admin: TestClient, db: Session) -> None:
+    json = {
+        "users": [
+            {"email": RandomStrings.random_email(), "password": "short"},
+            {
+                "email": RandomStrings.random_email(),
+                "password": RandomStrings.random_string(),
+            },
+        ]
+    }
+    response = client_admin.post(f"{settings.API_V1_STR}/users/bulk", json=json)
+    assert response.status_code == 422
+
+    UserValidator.validate_user_amount(db=db, amount=1)
+
+
 def test_register_new_user(client: TestClient, db: Session) -> None:
     user_register = UserRegister(
         email=RandomStrings.random_email(),
@@ -111,6 +242,47 @@ def test_get_specific_user(client_admin: TestClient, db: Session) -> None:
     assert response.status_code == 200
 
 
+@pytest.mark.usefixtures("stateless_tokens")
+def test_get_specific_user_stateless(
+    client: TestClient, db: Session, assert_max_queries: MaxQueries
+) -> None:
+    admin_params = UserFactory.create_admin_user(db=db)
+    access_token = OAuth.create_access_token(
+        subject=str(admin_params.user.id), user=admin_params.user
+    )
+    header = {"Authorization": f"Bearer {access_token}"}
+    user_params = UserFactory.create_random_user(db=db)
+
+    # Only the requested user is loaded, the admin is authorized from the token
+    with assert_max_queries(1):
+        response = client.get(
+            f"{settings.API_V1_STR}/users/{user_params.user.id}", headers=header
+        )
+    assert response.status_code == 200
+
+
+def test_get_specific_user_not_modified(client_admin: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    url = f"{settings.API_V1_STR}/users/{user_params.user.id}"
+    response = client_admin.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client_admin.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    user_update = UserUpdate(email=RandomStrings.random_email())
+    json = user_update.model_dump(exclude_unset=True)
+    response = client_admin.patch(url, json=json)
+    assert response.status_code == 200
+
+    response = client_admin.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
 def test_update_specific_user(client_admin: TestClient, db: Session) -> None:
     user_params = UserFactory.create_random_user(db=db)
     user_id = user_params.user.id
@@ -185,6 +357,68 @@ def test_get_me(client_user: TestClient, db: Session) -> None:
     assert user_api.user_group == user_db.user_group
 
 
+def test_get_me_cached(client_user: TestClient, assert_max_queries: MaxQueries) -> None:
+    response = client_user.get(f"{settings.API_V1_STR}/users/me")
+    assert response.status_code == 200
+
+    with assert_max_queries(0):
+        response = client_user.get(f"{settings.API_V1_STR}/users/me")
+    assert response.status_code == 200
+
+
+def test_get_me_uncached(
+    client_user: TestClient,
+    assert_max_queries: MaxQueries,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(user_cache, "_maxsize", 0)
+
+    # The access check and the route share one load of the user
+    with assert_max_queries(1):
+        response = client_user.get(f"{settings.API_V1_STR}/users/me")
+    assert response.status_code == 200
+
+
+def test_get_me_not_modified(
+    client_user: TestClient, assert_max_queries: MaxQueries
+) -> None:
+    response = client_user.get(f"{settings.API_V1_STR}/users/me")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    with assert_max_queries(0):
+        response = client_user.get(
+            f"{settings.API_V1_STR}/users/me",
+            headers={"If-None-Match": f'"other", W/{etag}'},
+        )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    user_update = UserUpdate(email=RandomStrings.random_email())
+    json = user_update.model_dump(exclude_unset=True)
+    response = client_user.patch(f"{settings.API_V1_STR}/users/me", json=json)
+    assert response.status_code == 200
+
+    # The update changed the user, the old ETag no longer matches
+    response = client_user.get(
+        f"{settings.API_V1_STR}/users/me", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_get_me_after_delete_me(client_user: TestClient) -> None:
+    response = client_user.get(f"{settings.API_V1_STR}/users/me")
+    assert response.status_code == 200
+
+    response = client_user.delete(f"{settings.API_V1_STR}/users/me")
+    assert response.status_code == 200
+
+    # Disabling the user drops it from the cache
+    response = client_user.get(f"{settings.API_V1_STR}/users/me")
+    assert response.status_code == 400
+
+
 def test_update_email_me(client_user: TestClient) -> None:
     user_update = UserUpdate(
         email=RandomStrings.random_email(),
@@ -222,6 +456,79 @@ def test_update_password_me(client: TestClient, db: Session) -> None:
     assert response.status_code == 200
 
 
+@pytest.mark.usefixtures("stateless_tokens")
+def test_update_password_me_revokes_tokens(client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+
+    access_token = OAuth.create_access_token(
+        subject=str(user_params.user.id), user=user_params.user
+    )
+    header = {"Authorization": f"Bearer {access_token}"}
+
+    user_update_password = UserUpdatePassword(
+        current_password=user_params.password,
+        new_password=RandomStrings.random_string(),
+    )
+    json = user_update_password.model_dump(exclude_unset=True)
+    response = client.patch(
+        f"{settings.API_V1_STR}/users/me/password", json=json, headers=header
+    )
+    assert response.status_code == 200
+
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers=header)
+    assert response.status_code == 403
+
+
+@pytest.mark.usefixtures("stateless_tokens")
+def test_disabled_user_stateless(client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+
+    access_token = OAuth.create_access_token(
+        subject=str(user_params.user.id), user=user_params.user
+    )
+    header = {"Authorization": f"Bearer {access_token}"}
+
+    user_repository.disable(db=db, db_obj=user_params.user)
+    assert user_params.user.token_version == 1
+
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers=header)
+    assert response.status_code == 400
+
+
+@pytest.mark.usefixtures("stateless_tokens")
+def test_token_version_bumped_past_cache(client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    old_token = OAuth.create_access_token(
+        subject=str(user_params.user.id), user=user_params.user
+    )
+    old_header = {"Authorization": f"Bearer {old_token}"}
+
+    # Caches the user with the version the old token was issued for
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers=old_header)
+    assert response.status_code == 200
+
+    # Bumped by another worker, this worker's cache isn't invalidated
+    db.connection().execute(
+        text('UPDATE "user" SET token_version = token_version + 1 WHERE id = :id'),
+        {"id": user_params.user.id},
+    )
+    db.expire(user_params.user)
+    assert user_params.user.is_active
+    new_token = OAuth.create_access_token(
+        subject=str(user_params.user.id), user=user_params.user
+    )
+    assert new_token != old_token
+
+    response = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {new_token}"},
+    )
+    assert response.status_code == 200
+
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers=old_header)
+    assert response.status_code == 403
+
+
 def test_update_me_incorrect_password(client_user: TestClient) -> None:
     user_update_password = UserUpdatePassword(
         current_password=RandomStrings.random_string(),
@@ -1,19 +1,24 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from glob import glob
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy_utils import (  # type: ignore[import-untyped]
     create_database,
     database_exists,
     drop_database,
 )
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.db.deps import get_db
+from src.db.deps import get_async_db, get_db, get_read_db
 from src.main.app import server
 from src.main.settings import settings
 from src.models import SQLModel as Base  # type: ignore[attr-defined]
+from src.repositories.user_repository import user_cache
 
 
 def _refactor_as_module(fixture_path: str) -> str:
@@ -28,6 +33,10 @@ pytest_plugins = [
 ]
 
 test_engine = create_engine(str(settings.SQLALCHEMY_TEST_DATABASE_URI))
+# Every async test runs in its own event loop, connections can't be pooled between them
+async_test_engine = create_async_engine(
+    str(settings.SQLALCHEMY_TEST_ASYNC_DATABASE_URI), poolclass=NullPool
+)
 
 
 def create_test_db() -> None:
@@ -36,6 +45,8 @@ def create_test_db() -> None:
 
 
 def drop_test_db() -> None:
+    # Pooled connections would block dropping the DB
+    test_engine.dispose()
     if database_exists(test_engine.url):
         drop_database(test_engine.url)
 
@@ -50,10 +61,31 @@ def setup_test_db() -> Generator[None]:
 
 @pytest.fixture(scope="function")
 def db() -> Generator[Session]:
-    session = Session(test_engine)
+    # Commits only release a savepoint, the outer transaction is rolled back
+    connection = test_engine.connect()
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
     yield session
-    session.rollback()
     session.close()
+    transaction.rollback()
+    connection.close()
+    # Cached users outlive the rolled back test transaction
+    user_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def async_db() -> AsyncGenerator[AsyncSession]:
+    async with async_test_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, expire_on_commit=False)
+        yield session
+        await session.close()
+        await transaction.rollback()
 
 
 @pytest.fixture(scope="function")
@@ -62,8 +94,23 @@ def client(db: Session) -> Generator[TestClient]:
         yield db
 
     server.dependency_overrides[get_db] = override_get_db
+    server.dependency_overrides[get_read_db] = override_get_db
 
     with TestClient(server) as c:
         yield c
 
     server.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+async def async_client(async_db: AsyncSession) -> AsyncGenerator[httpx.AsyncClient]:
+    # Runs the app on the test's event loop, the one async_db is bound to
+    async def override_get_async_db() -> AsyncGenerator[AsyncSession]:
+        yield async_db
+
+    server.dependency_overrides[get_async_db] = override_get_async_db
+    transport = httpx.ASGITransport(app=server)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+    server.dependency_overrides.clear()
@@ -0,0 +1,142 @@
+import datetime as dt
+
+import pytest
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.auth.oauth import OAuth
+from src.main.settings import settings
+from src.models.base import utc_now
+from src.models.token import RefreshToken
+from src.models.user import UserCreate, UserGroup, UserUpdate
+from src.repositories.token_repository import async_token_repository
+from src.repositories.user_repository import async_user_repository
+from tests.utils.random import RandomStrings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_async_create_user(async_db: AsyncSession) -> None:
+    user_create = UserCreate(
+        email=RandomStrings.random_email(),
+        password=RandomStrings.random_string(),
+        user_group=UserGroup.USER.value,
+    )
+    user = await async_user_repository.create_user(db=async_db, user_create=user_create)
+
+    user_db = await async_user_repository.get_by_email(
+        db=async_db, email=user_create.email
+    )
+    assert user_db is not None
+    assert user_db.id == user.id
+    assert OAuth.verify_password(
+        password=user_create.password, hashed_password=user_db.hashed_password
+    )
+
+
+async def test_async_update_user(async_db: AsyncSession) -> None:
+    user_create = UserCreate(
+        email=RandomStrings.random_email(),
+        password=RandomStrings.random_string(),
+    )
+    user = await async_user_repository.create_user(db=async_db, user_create=user_create)
+
+    new_password = RandomStrings.random_string()
+    user_update = UserUpdate(password=new_password)
+    await async_user_repository.update_user(
+        db=async_db, db_user=user, user_in=user_update
+    )
+
+    user_db = await async_user_repository.get_by_id(db=async_db, obj_id=user.id)
+    assert user_db is not None
+    assert OAuth.verify_password(
+        password=new_password, hashed_password=user_db.hashed_password
+    )
+
+
+async def test_async_disable_user(async_db: AsyncSession) -> None:
+    user_create = UserCreate(
+        email=RandomStrings.random_email(),
+        password=RandomStrings.random_string(),
+    )
+    user = await async_user_repository.create_user(db=async_db, user_create=user_create)
+    await async_user_repository.disable(db=async_db, db_obj=user)
+
+    active_users = await async_user_repository.get_active_range(db=async_db)
+    assert user.id not in [active_user.id for active_user in active_users]
+
+
+async def test_async_tokens(async_db: AsyncSession) -> None:
+    user_create = UserCreate(
+        email=RandomStrings.random_email(),
+        password=RandomStrings.random_string(),
+    )
+    user = await async_user_repository.create_user(db=async_db, user_create=user_create)
+
+    refresh_token = OAuth.create_refresh_token(subject=str(user.id))
+    token_create = RefreshToken(
+        refresh_token=refresh_token,
+        user_id=user.id,
+        expires_at=utc_now()
+        + dt.timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+    )
+    await async_token_repository.create_token(db=async_db, token_create=token_create)
+
+    token_db = await async_token_repository.get_by_token(
+        db=async_db, token=refresh_token
+    )
+    assert token_db is not None
+    user_tokens = await async_token_repository.get_by_user_id(
+        db=async_db, user_id=user.id
+    )
+    assert len(user_tokens) == 1
+
+    await async_token_repository.remove(db=async_db, db_obj=token_db)
+    user_tokens = await async_token_repository.get_by_user_id(
+        db=async_db, user_id=user.id
+    )
+    assert len(user_tokens) == 0
+
+
+async def test_async_token_set_operations(async_db: AsyncSession) -> None:
+    user_create = UserCreate(
+        email=RandomStrings.random_email(),
+        password=RandomStrings.random_string(),
+    )
+    user = await async_user_repository.create_user(db=async_db, user_create=user_create)
+
+    refresh_tokens = []
+    for _ in range(3):
+        refresh_token = OAuth.create_refresh_token(subject=str(user.id))
+        token_create = RefreshToken(
+            refresh_token=refresh_token,
+            user_id=user.id,
+            expires_at=utc_now()
+            + dt.timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+        )
+        await async_token_repository.create_token(
+            db=async_db, token_create=token_create
+        )
+        refresh_tokens.append(refresh_token)
+    assert (
+        await async_token_repository.count_by_user_id(db=async_db, user_id=user.id) == 3
+    )
+
+    token_db = await async_token_repository.delete_by_token(
+        db=async_db, token=refresh_tokens[0]
+    )
+    assert token_db is not None
+    assert token_db.refresh_token == refresh_tokens[0]
+    assert (
+        await async_token_repository.delete_by_token(
+            db=async_db, token=refresh_tokens[0]
+        )
+        is None
+    )
+
+    deleted = await async_token_repository.delete_by_user_id(
+        db=async_db, user_id=user.id
+    )
+    assert deleted == 2
+    assert (
+        await async_token_repository.count_by_user_id(db=async_db, user_id=user.id) == 0
+    )
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine
+from sqlalchemy_utils import drop_database  # type: ignore[import-untyped]
+from sqlmodel import Session, create_engine, select
+
+from src.db.bootstrap import bootstrap
+from src.main.settings import settings
+from src.models.user import User
+
+ROOT_DIR = Path(__file__).parents[2]
+
+
+@pytest.fixture(scope="function")
+def bootstrap_engine() -> Generator[Engine]:
+    # An empty database, bootstrap creates it and applies every migration
+    db_engine = create_engine(str(settings.SQLALCHEMY_TEST_DATABASE_URI) + "_bootstrap")
+    yield db_engine
+    db_engine.dispose()
+    drop_database(db_engine.url)
+
+
+def test_db_bootstrap(bootstrap_engine: Engine) -> None:
+    phases = bootstrap(bootstrap_engine)
+    assert list(phases.durations) == ["ping", "upgrade", "head check", "seed"]
+
+    with Session(bootstrap_engine) as db:
+        users = db.exec(select(User)).all()
+    assert len(users) == 2
+
+    # Running it again changes nothing
+    bootstrap(bootstrap_engine)
+    with Session(bootstrap_engine) as db:
+        users = db.exec(select(User)).all()
+    assert len(users) == 2
+
+
+def test_db_bootstrap_script(bootstrap_engine: Engine, tmp_path: Path) -> None:
+    # Started the way startup.sh starts it, as a script of its own, with
+    # a metrics directory that doesn't exist yet
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT_DIR),
+        "POSTGRES_DB": str(bootstrap_engine.url.database),
+        "PROMETHEUS_MULTIPROC_DIR": str(tmp_path / "prometheus"),
+    }
+    result = subprocess.run(
+        [sys.executable, "src/db/bootstrap.py"],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert "Bootstrap finished" in result.stderr
+
+    with Session(bootstrap_engine) as db:
+        users = db.exec(select(User)).all()
+    assert len(users) == 2
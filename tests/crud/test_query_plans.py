@@ -0,0 +1,120 @@
+import datetime as dt
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from sqlalchemy import insert, text
+from sqlmodel import Session, SQLModel
+
+from src.models.base import utc_now
+from src.models.pagination import PageCursor
+from src.models.token import RefreshToken
+from src.models.user import User
+from src.repositories.token_repository import token_repository
+from src.repositories.user_repository import user_repository
+from tests.utils.query_plan import QueryPlan
+from tests.utils.random import RandomStrings
+
+SEEDED_USERS = 2000
+TOKENS_PER_USER = 5
+# Small tables are cheaper to scan, the planner rightly skips their indexes
+ROW_THRESHOLD = 1000
+
+
+class SeededData(SQLModel):
+    user: User
+    token: RefreshToken
+
+
+@pytest.fixture(scope="function")
+def seeded_db(db: Session) -> SeededData:
+    now = utc_now()
+    users: list[dict[str, Any]] = [
+        {
+            "id": uuid.uuid4(),
+            "email": RandomStrings.random_email(),
+            "hashed_password": RandomStrings.random_string(),
+            "created": now + dt.timedelta(seconds=index),
+            "updated": now,
+        }
+        for index in range(SEEDED_USERS)
+    ]
+    tokens: list[dict[str, Any]] = [
+        {
+            "id": uuid.uuid4(),
+            "refresh_token": RandomStrings.random_string(),
+            "user_id": user["id"],
+            # Spread out so that only a few tokens have expired, like in production
+            "expires_at": now + dt.timedelta(minutes=number),
+        }
+        for number, user in enumerate(users * TOKENS_PER_USER)
+    ]
+    connection = db.connection()
+    connection.execute(insert(User), users)
+    connection.execute(insert(RefreshToken), tokens)
+    # Gives the planner row estimates of the seeded tables
+    connection.execute(text('ANALYZE "user", refreshtoken'))
+
+    user = user_repository.get_by_id(db=db, obj_id=users[0]["id"])
+    token = token_repository.get_by_token(db=db, token=tokens[0]["refresh_token"])
+    assert user is not None
+    assert token is not None
+    return SeededData(user=user, token=token)
+
+
+def _user_tokens(db: Session, seeded: SeededData) -> Any:
+    db.expire(seeded.user, ["tokens"])
+    return seeded.user.tokens
+
+
+HOT_QUERIES: dict[str, Callable[[Session, SeededData], Any]] = {
+    "user_get_by_id": lambda db, seeded: user_repository.get_by_id(
+        db=db, obj_id=seeded.user.id
+    ),
+    "user_get_by_email": lambda db, seeded: user_repository.get_by_email(
+        db=db, email=seeded.user.email
+    ),
+    "user_get_range_after": lambda db, seeded: user_repository.get_range_after(
+        db=db, cursor=PageCursor(created=seeded.user.created, id=seeded.user.id)
+    ),
+    "user_get_active_range_after": lambda db, seeded: (
+        user_repository.get_active_range_after(
+            db=db, cursor=PageCursor(created=seeded.user.created, id=seeded.user.id)
+        )
+    ),
+    "user_tokens": _user_tokens,
+    "token_get_by_token": lambda db, seeded: token_repository.get_by_token(
+        db=db, token=seeded.token.refresh_token
+    ),
+    "token_get_by_user_id": lambda db, seeded: token_repository.get_by_user_id(
+        db=db, user_id=seeded.user.id
+    ),
+    "token_count_by_user_id": lambda db, seeded: token_repository.count_by_user_id(
+        db=db, user_id=seeded.user.id
+    ),
+    "token_delete_by_user_id": lambda db, seeded: token_repository.delete_by_user_id(
+        db=db, user_id=seeded.user.id
+    ),
+    "token_delete_by_token": lambda db, seeded: token_repository.delete_by_token(
+        db=db, token=seeded.token.refresh_token
+    ),
+    "token_delete_expired_batch": lambda db, seeded: (
+        token_repository.delete_expired_batch(db=db, now=utc_now(), batch_size=100)
+    ),
+}
+
+
+@pytest.mark.parametrize("query_name", HOT_QUERIES)
+def test_hot_query_uses_indexes(
+    db: Session, seeded_db: SeededData, query_name: str
+) -> None:
+    with QueryPlan.capture(db=db) as statements:
+        HOT_QUERIES[query_name](db, seeded_db)
+    assert statements
+
+    for captured in statements:
+        seq_scans = QueryPlan.seq_scans(
+            db=db, captured=captured, row_threshold=ROW_THRESHOLD
+        )
+        assert not seq_scans, f"Sequential scan of {seq_scans}: {captured.statement}"
@@ -0,0 +1,120 @@
+import logging
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from src.db import slow_query_log as slow_query_log_module
+from src.db.slow_query_log import SlowQueryLog
+from src.repositories.token_repository import token_repository
+from src.repositories.user_repository import user_repository
+from tests.conftest import test_engine
+from tests.factories.user import UserFactory
+
+
+@pytest.fixture(scope="function")
+def slow_query_records(
+    caplog: pytest.LogCaptureFixture,
+) -> Generator[pytest.LogCaptureFixture]:
+    # The app loggers don't propagate to the root logger that caplog listens on
+    logger = slow_query_log_module.logger
+    logger.addHandler(caplog.handler)
+    with caplog.at_level(logging.WARNING, logger=logger.name):
+        yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+def _listen(log: SlowQueryLog, engine: Engine) -> Generator[None]:
+    log.listen(engine)
+    yield
+    log.remove(engine)
+
+
+@pytest.fixture(scope="function")
+def log_every_query() -> Generator[None]:
+    yield from _listen(SlowQueryLog(threshold_ms=0), test_engine)
+
+
+@pytest.fixture(scope="function")
+def explain_every_query() -> Generator[None]:
+    log = SlowQueryLog(threshold_ms=0, explain_engine=test_engine)
+    yield from _listen(log, test_engine)
+
+
+@pytest.mark.usefixtures("log_every_query")
+def test_slow_query_log_caller_and_redaction(
+    db: Session, slow_query_records: pytest.LogCaptureFixture
+) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    slow_query_records.clear()
+
+    user_repository.get_by_email(db=db, email=user_params.email)
+
+    assert len(slow_query_records.messages) == 1
+    message = slow_query_records.messages[0]
+    assert "UserRepository.get_by_email" in message
+    assert 'FROM "user"' in message
+    assert "'email_1': 'str'" in message
+    assert user_params.email not in message
+
+
+@pytest.mark.usefixtures("log_every_query")
+def test_slow_query_log_static_method_caller(
+    db: Session, slow_query_records: pytest.LogCaptureFixture
+) -> None:
+    token_repository.get_by_token(db=db, token="not-a-token")
+
+    # The test session starts with a savepoint
+    messages = [
+        message for message in slow_query_records.messages if "SAVEPOINT" not in message
+    ]
+    assert len(messages) == 1
+    assert "TokenRepository.get_by_token" in messages[0]
+    assert "not-a-token" not in messages[0]
+
+
+def test_slow_query_log_under_threshold(
+    db: Session, slow_query_records: pytest.LogCaptureFixture
+) -> None:
+    log = SlowQueryLog(threshold_ms=60_000)
+    log.listen(test_engine)
+    try:
+        user_repository.get_range(db=db)
+    finally:
+        log.remove(test_engine)
+    assert slow_query_records.messages == []
+
+
+@pytest.mark.usefixtures("explain_every_query")
+def test_slow_query_log_explain(
+    db: Session, slow_query_records: pytest.LogCaptureFixture
+) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    slow_query_records.clear()
+
+    user_repository.get_by_email(db=db, email=user_params.email)
+
+    # The statements on the side connection go through the same engine here
+    message = next(
+        record
+        for record in slow_query_records.messages
+        if "UserRepository.get_by_email: SELECT" in record
+    )
+    assert "actual time=" in message
+    assert "Buffers:" in message or "Planning:" in message
+
+
+@pytest.mark.usefixtures("explain_every_query")
+def test_slow_query_log_explain_skips_writes(
+    db: Session, slow_query_records: pytest.LogCaptureFixture
+) -> None:
+    UserFactory.create_random_user(db=db)
+
+    insert_messages = [
+        record
+        for record in slow_query_records.messages
+        if record.count("INSERT INTO") == 1
+    ]
+    assert insert_messages
+    assert all("actual time=" not in record for record in insert_messages)
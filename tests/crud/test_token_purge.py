@@ -0,0 +1,33 @@
+from sqlmodel import Session
+
+from src.db.purge_tokens import purge_expired_tokens
+from tests.factories.token import TokenFactory
+from tests.factories.user import UserFactory
+from tests.validators.token import TokenValidator
+
+
+def test_purge_expired_tokens(db: Session) -> None:
+    user = UserFactory.create_random_user(db=db).user
+    # Tokens of a user with the same expiry would be identical
+    for minutes in range(3):
+        TokenFactory.create_refresh_token(
+            db=db, user_id=user.id, delta_minutes=-10 - minutes
+        )
+    for _ in range(2):
+        TokenFactory.create_refresh_token(db=db, user_id=user.id)
+
+    result = purge_expired_tokens(db=db, batch_size=2)
+    assert result.deleted == 3
+    # A full batch deletes 2, the second deletes the last 1 and ends the purge
+    assert result.batches == 2
+    TokenValidator.validate_refresh_token_amount(db=db, amount=2)
+
+
+def test_purge_without_expired_tokens(db: Session) -> None:
+    user = UserFactory.create_random_user(db=db).user
+    TokenFactory.create_refresh_token(db=db, user_id=user.id)
+
+    result = purge_expired_tokens(db=db, batch_size=2)
+    assert result.deleted == 0
+    assert result.batches == 1
+    TokenValidator.validate_refresh_token_amount(db=db, amount=1)
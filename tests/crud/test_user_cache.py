@@ -0,0 +1,85 @@
+import time
+
+from sqlmodel import Session
+
+from src.models.user import User, UserUpdate
+from src.repositories.cache import ModelCache
+from src.repositories.user_repository import user_cache, user_repository
+from tests.factories.user import UserFactory
+from tests.utils.random import RandomStrings
+
+
+def test_cache_get(db: Session) -> None:
+    user = UserFactory.create_random_user(db=db).user
+    cache = ModelCache(User, maxsize=10, ttl=60)
+    cache.set(user)
+
+    cached_user = cache.get(user.id)
+    assert cached_user is not None
+    assert cached_user is not user
+    assert cached_user.email == user.email
+    assert cached_user.hashed_password == user.hashed_password
+
+
+def test_cache_expires(db: Session) -> None:
+    user = UserFactory.create_random_user(db=db).user
+    cache = ModelCache(User, maxsize=10, ttl=0.01)
+    cache.set(user)
+
+    time.sleep(0.02)
+    assert cache.get(user.id) is None
+
+
+def test_cache_evicts_least_recently_used(db: Session) -> None:
+    users = [UserFactory.create_random_user(db=db).user for _ in range(3)]
+    cache = ModelCache(User, maxsize=2, ttl=60)
+    cache.set(users[0])
+    cache.set(users[1])
+    # Reading the first user makes the second one the least recently used
+    cache.get(users[0].id)
+    cache.set(users[2])
+
+    assert cache.get(users[0].id) is not None
+    assert cache.get(users[1].id) is None
+    assert cache.get(users[2].id) is not None
+
+
+def test_cached_user_attaches_to_session(db: Session) -> None:
+    user = UserFactory.create_random_user(db=db).user
+    user_repository.get_by_id_cached(db=db, obj_id=user.id)
+    db.expunge(user)
+
+    cached_user = user_repository.get_by_id_cached(db=db, obj_id=user.id)
+    assert cached_user is not None
+    assert cached_user in db
+    assert not db.dirty
+
+
+def test_update_user_invalidates_cache(db: Session) -> None:
+    user = UserFactory.create_random_user(db=db).user
+    user_repository.get_by_id_cached(db=db, obj_id=user.id)
+
+    user_update = UserUpdate(email=RandomStrings.random_email())
+    user_repository.update_user(db=db, db_user=user, user_in=user_update)
+    assert user_cache.get(user.id) is None
+
+
+def test_disable_invalidates_cache(db: Session) -> None:
+    user = UserFactory.create_random_user(db=db).user
+    user_repository.get_by_id_cached(db=db, obj_id=user.id)
+
+    user_repository.disable(db=db, db_obj=user)
+    assert user_cache.get(user.id) is None
+
+
+def test_update_user_invalidates_cache_on_commit(db: Session) -> None:
+    user = UserFactory.create_random_user(db=db).user
+    user_update = UserUpdate(email=RandomStrings.random_email())
+    user_repository.update_user(db=db, db_user=user, user_in=user_update)
+
+    # Cached by a request that read the row before the update was committed
+    cache_entry_user = User.model_validate(user, update={"email": "old@example.com"})
+    user_cache.set(cache_entry_user)
+
+    db.commit()
+    assert user_cache.get(user.id) is None
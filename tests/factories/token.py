@@ -26,5 +26,6 @@ class TokenFactory:
         token_create = RefreshToken(
             refresh_token=refresh_token,
             user_id=user_id,
+            expires_at=expires.replace(tzinfo=None),
         )
         return token_repository.create_token(db=db, token_create=token_create)
@@ -5,6 +5,7 @@ from sqlmodel import Session
 from starlette.testclient import TestClient
 
 from src.auth.oauth import OAuth
+from src.main.settings import settings
 from tests.factories.user import UserFactory
 
 
@@ -32,3 +33,8 @@ def client_user(db: Session, client: TestClient) -> Generator[TestClient]:
     yield client
     # Cleanup - removes headers
     client.headers.clear()
+
+
+@pytest.fixture(scope="function")
+def stateless_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_STATELESS", True)
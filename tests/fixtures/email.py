@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import socket
+import threading
+from collections.abc import Generator
+from email.message import Message
+from email.parser import BytesParser
+from typing import Any
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult, Envelope
+
+from src.email.email_delivery import SMTPConfig
+from tests.utils.random import RandomStrings
+
+# aiosmtpd warns about its own deprecated attribute on every login
+logging.getLogger("mail.log").setLevel(logging.ERROR)
+
+
+class LocalSMTPServer:
+    """Stand-in SMTP server that keeps the messages it receives in memory"""
+
+    def __init__(self) -> None:
+        self.user = RandomStrings.random_email()
+        self.password = RandomStrings.random_string()
+        self.messages: list[Message] = []
+        self.logins = 0
+        # Cleared to make the server hold messages until it is set again
+        self.accepting = threading.Event()
+        self.accepting.set()
+        self.receiving = threading.Event()
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port: int = sock.getsockname()[1]
+        self._controller: Controller | None = None
+
+    def _authenticate(self, *args: Any) -> AuthResult:
+        _server, _session, _envelope, _mechanism, auth_data = args
+        self.logins += 1
+        success = (
+            auth_data.login.decode() == self.user
+            and auth_data.password.decode() == self.password
+        )
+        return AuthResult(success=success)
+
+    async def handle_DATA(self, *args: Any) -> str:
+        envelope: Envelope = args[2]
+        self.receiving.set()
+        while not self.accepting.is_set():
+            await asyncio.sleep(0.01)
+        assert isinstance(envelope.content, bytes)
+        self.messages.append(BytesParser().parsebytes(envelope.content))
+        return "250 Message accepted for delivery"
+
+    @property
+    def config(self) -> SMTPConfig:
+        return SMTPConfig(
+            host="127.0.0.1",
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            tls=False,
+        )
+
+    def start(self) -> None:
+        # A stopped controller can't be started again, every start gets a new one
+        self._controller = Controller(
+            self,
+            hostname="127.0.0.1",
+            port=self.port,
+            authenticator=self._authenticate,
+            auth_require_tls=False,
+        )
+        self._controller.start()
+
+    def stop(self) -> None:
+        if self._controller is not None:
+            self._controller.stop()
+            self._controller = None
+
+
+@pytest.fixture(scope="function")
+def smtp_server() -> Generator[LocalSMTPServer]:
+    server = LocalSMTPServer()
+    server.start()
+    yield server
+    server.stop()
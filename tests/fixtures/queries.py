@@ -0,0 +1,28 @@
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+
+import pytest
+
+from src.db.query_counter import QueryCounter, count_engine_queries
+from tests.conftest import test_engine
+
+MaxQueries = Callable[[int], AbstractContextManager[QueryCounter]]
+
+
+@pytest.fixture(scope="function")
+def assert_max_queries() -> MaxQueries:
+    """
+    Fails the test if the block sends more statements than allowed,
+    usage: `with assert_max_queries(2): client.get(...)`
+    """
+
+    @contextmanager
+    def max_queries(max_amount: int) -> Iterator[QueryCounter]:
+        with count_engine_queries(test_engine) as counter:
+            yield counter
+        assert counter.count <= max_amount, (
+            f"{counter.count} queries, expected at most {max_amount}:\n"
+            + counter.summary()
+        )
+
+    return max_queries
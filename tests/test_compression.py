@@ -0,0 +1,105 @@
+import zlib
+from collections.abc import AsyncIterator
+
+import anyio
+import pytest
+from sqlmodel import Session
+from starlette.responses import StreamingResponse
+from starlette.testclient import TestClient
+from starlette.types import Message, Scope
+
+from src.main.compression import CompressionMiddleware, choose_encoding
+from src.main.settings import settings
+from tests.factories.user import UserFactory
+
+
+@pytest.mark.parametrize(
+    "accept_encoding,encoding",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding(accept_encoding: str, encoding: str | None) -> None:
+    assert choose_encoding(accept_encoding) == encoding
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_compress_user_list(
+    client_admin: TestClient, db: Session, encoding: str
+) -> None:
+    for _ in range(10):
+        UserFactory.create_random_user(db=db)
+
+    response = client_admin.get(
+        f"{settings.API_V1_STR}/users/", headers={"Accept-Encoding": encoding}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert len(response.json()["users"]) == 11
+
+
+def test_skip_small_response(client: TestClient) -> None:
+    data = {"username": "wrong", "password": "wrong"}
+    response = client.post(
+        f"{settings.API_V1_STR}/login", data=data, headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 400
+    assert "Content-Encoding" not in response.headers
+
+
+def test_compress_export(client_admin: TestClient, db: Session) -> None:
+    for _ in range(10):
+        UserFactory.create_random_user(db=db)
+
+    response = client_admin.get(
+        f"{settings.API_V1_STR}/users/export", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.text.splitlines()) == 11
+
+
+def test_compress_chunk_by_chunk() -> None:
+    chunks = [b'{"row": 1}\n' * 50, b'{"row": 2}\n' * 50, b'{"row": 3}\n' * 50]
+
+    async def stream_rows() -> AsyncIterator[bytes]:
+        for chunk in chunks:
+            yield chunk
+
+    app = CompressionMiddleware(
+        StreamingResponse(stream_rows(), media_type="application/x-ndjson"),
+        min_size=1024,
+        gzip_level=6,
+        brotli_quality=4,
+    )
+    scope: Scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    sent: list[Message] = []
+
+    async def receive() -> Message:
+        await anyio.sleep_forever()
+        return {}
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    anyio.run(app, scope, receive, send)
+
+    start, *bodies = sent
+    assert dict(start["headers"])[b"content-encoding"] == b"gzip"
+    assert len(bodies) == len(chunks) + 1
+    # Every chunk can be decoded as soon as it arrives
+    decompressor = zlib.decompressobj(31)
+    for chunk, body in zip(chunks, bodies, strict=False):
+        assert decompressor.decompress(body["body"]) == chunk
@@ -1,3 +1,4 @@
+from src.email.email_delivery import email_delivery
 from src.email.email_sender import EmailSender
 from src.main.settings import settings
 
@@ -5,6 +6,8 @@ from src.main.settings import settings
 def main() -> None:
     email_receiver = settings.TEST_EMAIL_DESTINATION
     EmailSender.send_test_email(email_receiver=email_receiver)
+    # Waits for the background worker to send it
+    email_delivery.shutdown()
 
 
 if __name__ == "__main__":
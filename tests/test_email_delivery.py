@@ -0,0 +1,74 @@
+from email.mime.text import MIMEText
+
+import pytest
+
+from src.email.email_delivery import EmailDelivery, mask_email
+from src.exceptions.service_unavailable_503 import ServerBusy503Exception
+from tests.fixtures.email import LocalSMTPServer
+from tests.utils.random import RandomStrings
+
+
+def _message(*, smtp_server: LocalSMTPServer) -> MIMEText:
+    message = MIMEText(RandomStrings.random_string(), "html")
+    message["Subject"] = RandomStrings.random_string()
+    message["From"] = smtp_server.user
+    message["To"] = RandomStrings.random_email()
+    return message
+
+
+def test_send_reuses_connections(smtp_server: LocalSMTPServer) -> None:
+    delivery = EmailDelivery(workers=2, max_queued=100, config=smtp_server.config)
+    messages = [_message(smtp_server=smtp_server) for _ in range(20)]
+    for message in messages:
+        delivery.send(message)
+    delivery.shutdown()
+
+    assert len(smtp_server.messages) == len(messages)
+    received = {message["Subject"] for message in smtp_server.messages}
+    assert received == {message["Subject"] for message in messages}
+    # One login per pooled connection, not one per message
+    assert smtp_server.logins <= 2
+
+
+def test_send_reconnects(smtp_server: LocalSMTPServer) -> None:
+    delivery = EmailDelivery(workers=1, max_queued=100, config=smtp_server.config)
+    delivery.send(_message(smtp_server=smtp_server))
+    delivery.flush()
+
+    # Drops the pooled connection on the server side
+    smtp_server.stop()
+    smtp_server.start()
+
+    delivery.send(_message(smtp_server=smtp_server))
+    delivery.shutdown()
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.logins == 2
+
+
+def test_send_rejects_when_queue_is_full(smtp_server: LocalSMTPServer) -> None:
+    delivery = EmailDelivery(workers=1, max_queued=1, config=smtp_server.config)
+    smtp_server.accepting.clear()
+
+    delivery.send(_message(smtp_server=smtp_server))
+    # The worker holds the first message, the second one waits in the queue
+    smtp_server.receiving.wait()
+    delivery.send(_message(smtp_server=smtp_server))
+    with pytest.raises(ServerBusy503Exception):
+        delivery.send(_message(smtp_server=smtp_server))
+
+    smtp_server.accepting.set()
+    delivery.shutdown()
+    assert len(smtp_server.messages) == 2
+
+
+@pytest.mark.parametrize(
+    "address,masked",
+    [
+        ("john.doe@example.com", "j***@example.com"),
+        ("@example.com", "***@example.com"),
+        ("invalid", "***"),
+        (None, "***"),
+    ],
+)
+def test_mask_email(address: str | None, masked: str) -> None:
+    assert mask_email(address) == masked
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from src.email import email_template_schemas
+from src.email.email_templates import EmailTemplateRegistry
+from tests.utils.random import RandomStrings
+
+
+def _write_template(directory: Path) -> None:
+    template_path = directory / "test_email.html"
+    template_path.write_text("<p>{{ project_name }} test email for {{ email }}</p>")
+
+
+def test_render(tmp_path: Path) -> None:
+    _write_template(tmp_path)
+    registry = EmailTemplateRegistry(directory=tmp_path, bytecode_cache_dir=None)
+    email = RandomStrings.random_email()
+
+    html_content = registry.render(
+        template_context=email_template_schemas.TestEmailTemplate(
+            project_name="Project", email=email
+        )
+    )
+    assert html_content == f"<p>Project test email for {email}</p>"
+
+
+def test_preload_compiles_once(tmp_path: Path) -> None:
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    bytecode_cache_dir = tmp_path / "bytecode"
+    bytecode_cache_dir.mkdir()
+    _write_template(templates_dir)
+
+    registry = EmailTemplateRegistry(
+        directory=templates_dir, bytecode_cache_dir=str(bytecode_cache_dir)
+    )
+    registry.preload()
+    assert list(bytecode_cache_dir.iterdir())
+
+    # Rendering uses the compiled template, the file isn't read again
+    (templates_dir / "test_email.html").unlink()
+    template_context = email_template_schemas.TestEmailTemplate(
+        project_name="Project", email=RandomStrings.random_email()
+    )
+    for _ in range(3):
+        assert registry.render(template_context=template_context)
@@ -0,0 +1,48 @@
+import pytest
+
+from src.exceptions.bad_request_400 import InvalidCredentials400Exception
+from src.exceptions.base_exception import BaseHTTPException
+from src.exceptions.not_implemented_501 import ActionUnavailable501Exception
+from src.main.settings import StackCapture, settings
+
+
+def _raise_credentials_error() -> InvalidCredentials400Exception:
+    try:
+        raise InvalidCredentials400Exception("Incorrect email or password")
+    except InvalidCredentials400Exception as exc:
+        return exc
+
+
+def test_exception_stack_always(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EXCEPTION_STACK_4XX", StackCapture.ALWAYS)
+    exc = _raise_credentials_error()
+
+    assert exc.trace is not None
+    # Ends with the frame that raised it
+    assert "_raise_credentials_error" in exc.trace.splitlines()[-2]
+    assert "raise InvalidCredentials400Exception" in exc.trace
+
+
+def test_exception_stack_never(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EXCEPTION_STACK_4XX", StackCapture.NEVER)
+    exc = _raise_credentials_error()
+    assert exc.trace is None
+
+
+@pytest.mark.parametrize(("sample_rate", "captured"), [(0, False), (1, True)])
+def test_exception_stack_sampled(
+    monkeypatch: pytest.MonkeyPatch, sample_rate: float, captured: bool
+) -> None:
+    monkeypatch.setattr(settings, "EXCEPTION_STACK_4XX", StackCapture.SAMPLED)
+    monkeypatch.setattr(settings, "EXCEPTION_STACK_SAMPLE_RATE", sample_rate)
+    exc = _raise_credentials_error()
+    assert (exc.trace is not None) == captured
+
+
+def test_exception_stack_per_status_class(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "EXCEPTION_STACK_4XX", StackCapture.NEVER)
+    monkeypatch.setattr(settings, "EXCEPTION_STACK_5XX", StackCapture.ALWAYS)
+
+    assert BaseHTTPException("Server error").trace is not None
+    assert ActionUnavailable501Exception("Not available").trace is not None
+    assert _raise_credentials_error().trace is None
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Generous for slower machines, the app imports in about 0.6 s locally
+IMPORT_TIME_BUDGET_MS = 1500
+
+ROOT_DIR = Path(__file__).parents[1]
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from -X importtime"""
+    # Nothing listens on port 1, connecting to the database fails the import
+    env = {**os.environ, "POSTGRES_SERVER": "localhost", "POSTGRES_PORT": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_app_without_database() -> None:
+    times = _import_times("src.main.app")
+
+    assert times["src.main.app"] / 1000 < IMPORT_TIME_BUDGET_MS
+    # Only needed to create the database before startup
+    assert "sqlalchemy_utils" not in times
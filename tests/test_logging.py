@@ -0,0 +1,78 @@
+import io
+import logging
+import re
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from src.main.logging import REQUEST_ID_HEADER, create_handler, get_logger
+from src.main.settings import LoggingFormat, settings
+
+
+def test_json_logging_from_queue() -> None:
+    stream = io.StringIO()
+    handler, listener = create_handler(logging_format=LoggingFormat.JSON, stream=stream)
+    assert listener is not None
+    logger = logging.getLogger("tests.json")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+
+    # Records wait in the queue until the listener writes them
+    logger.info("User %s logged in", "user@email.com")
+    assert stream.getvalue() == ""
+
+    listener.start()
+    try:
+        raise ValueError("Broken")
+    except ValueError:
+        logger.exception("Request failed")
+    listener.stop()
+    logger.removeHandler(handler)
+
+    first, second = [orjson.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "User user@email.com logged in"
+    assert first["level"] == "INFO"
+    assert first["logger"] == "tests.json"
+    assert first["request_id"] is None
+    assert first["route"] is None
+    assert second["message"] == "Request failed"
+    assert "ValueError: Broken" in second["exception"]
+
+
+def test_json_logging_request_fields(client: TestClient) -> None:
+    stream = io.StringIO()
+    handler, listener = create_handler(logging_format=LoggingFormat.JSON, stream=stream)
+    assert listener is not None
+    # The exception handler logs every rejected request
+    logger = get_logger("src.exceptions.handler")
+    logger.addHandler(handler)
+    listener.start()
+
+    headers = {"Authorization": "Bearer invalid", REQUEST_ID_HEADER: "request-1"}
+    response = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+
+    listener.stop()
+    logger.removeHandler(handler)
+    assert response.status_code == 403
+    assert response.headers[REQUEST_ID_HEADER] == "request-1"
+
+    log = orjson.loads(stream.getvalue().splitlines()[-1])
+    assert log["request_id"] == "request-1"
+    assert log["route"] == f"{settings.API_V1_STR}/users/me"
+
+
+def test_request_id_generated(client: TestClient) -> None:
+    first = client.get(f"{settings.API_V1_STR}/health")
+    second = client.get(f"{settings.API_V1_STR}/health")
+    assert first.headers[REQUEST_ID_HEADER] != second.headers[REQUEST_ID_HEADER]
+
+
+@pytest.mark.parametrize("request_id", ["", "a" * 129, "request 1", "request/1"])
+def test_request_id_replaced_when_invalid(client: TestClient, request_id: str) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/health", headers={REQUEST_ID_HEADER: request_id}
+    )
+    assert response.headers[REQUEST_ID_HEADER] != request_id
+    assert re.fullmatch(r"[0-9a-f]{32}", response.headers[REQUEST_ID_HEADER])
@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from src.auth.password_hasher import PasswordHasher, pwd_context
+from src.exceptions.service_unavailable_503 import ServerBusy503Exception
+from tests.utils.random import RandomStrings
+
+
+def test_hash_and_verify() -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    password = RandomStrings.random_string()
+
+    password_hash = hasher.hash(password=password)
+    assert hasher.verify(password=password, hashed_password=password_hash)
+    assert not hasher.verify(
+        password=RandomStrings.random_string(), hashed_password=password_hash
+    )
+    hasher.shutdown()
+
+
+def test_hash_many() -> None:
+    # More passwords than pending slots, the bulk hash never holds more than 2
+    hasher = PasswordHasher(max_workers=2, max_pending=2)
+    passwords = [RandomStrings.random_string() for _ in range(5)]
+
+    password_hashes = hasher.hash_many(passwords=passwords)
+    assert len(password_hashes) == len(passwords)
+    for password, password_hash in zip(passwords, password_hashes, strict=True):
+        assert hasher.verify(password=password, hashed_password=password_hash)
+    hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_hash_and_verify_async() -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    password = RandomStrings.random_string()
+
+    password_hash = await hasher.hash_async(password=password)
+    assert await hasher.verify_async(password=password, hashed_password=password_hash)
+    hasher.shutdown()
+
+
+def test_rejects_when_queue_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_hash(password: str) -> str:
+        started.set()
+        release.wait()
+        return password
+
+    monkeypatch.setattr(pwd_context, "hash", blocking_hash)
+    thread = threading.Thread(
+        target=hasher.hash, kwargs={"password": RandomStrings.random_string()}
+    )
+    thread.start()
+    # The only slot is taken until the hash is released
+    started.wait()
+
+    with pytest.raises(ServerBusy503Exception):
+        hasher.hash(password=RandomStrings.random_string())
+
+    release.set()
+    thread.join()
+    hasher.shutdown()
+
+
+def test_hash_many_in_parallel(monkeypatch: pytest.MonkeyPatch) -> None:
+    hasher = PasswordHasher(max_workers=2, max_pending=2)
+    # Only passed once both threads hash at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def parallel_hash(password: str) -> str:
+        barrier.wait()
+        return password
+
+    monkeypatch.setattr(pwd_context, "hash", parallel_hash)
+    passwords = [RandomStrings.random_string() for _ in range(4)]
+
+    assert hasher.hash_many(passwords=passwords) == passwords
+    hasher.shutdown()
@@ -0,0 +1,67 @@
+from collections.abc import Generator
+
+import pytest
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from src.auth.oauth import OAuth
+from src.db.deps import get_db
+from src.db.query_counter import (
+    QueryBudgetExceeded,
+    QueryBudgetMiddleware,
+    count_queries,
+    listen_query_counter,
+)
+from src.main.app import server
+from src.main.settings import settings
+from src.repositories.user_repository import user_repository
+from tests.conftest import test_engine
+from tests.factories.user import UserFactory
+
+
+@pytest.fixture(scope="function")
+def strict_budget_client(db: Session) -> Generator[TestClient]:
+    def override_get_db() -> Generator[Session]:
+        yield db
+
+    server.dependency_overrides[get_db] = override_get_db
+    listen_query_counter(test_engine)
+    app = QueryBudgetMiddleware(server, budget=1, repeat_limit=2, raise_error=True)
+
+    with TestClient(app) as c:
+        yield c
+
+    server.dependency_overrides.clear()
+
+
+def test_count_queries_repeated(db: Session) -> None:
+    users = [UserFactory.create_random_user(db=db).user for _ in range(3)]
+    listen_query_counter(test_engine)
+
+    with count_queries() as counter:
+        for user in users:
+            user_repository.get_by_id(db=db, obj_id=user.id)
+        user_repository.get_range(db=db)
+
+    assert counter.count == 4
+    repeated = counter.repeated(limit=3)
+    assert len(repeated) == 1
+    assert list(repeated.values()) == [3]
+
+
+def test_query_budget_within(strict_budget_client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    access_token = OAuth.create_access_token(subject=str(user_params.user.id))
+    # The user is loaded once, the second dependency that needs it gets it cached
+    response = strict_budget_client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == 200
+
+
+def test_query_budget_exceeded(strict_budget_client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    data = {"username": user_params.email, "password": user_params.password}
+    with pytest.raises(QueryBudgetExceeded, match="POST /api/v1/login: 3 queries"):
+        strict_budget_client.post(f"{settings.API_V1_STR}/login", data=data)
@@ -0,0 +1,66 @@
+from collections.abc import Generator
+
+import pytest
+from sqlmodel import Session
+from starlette.testclient import TestClient
+
+from src.db.deps import get_db
+from src.main.app import server
+from src.main.settings import settings
+from src.main.timing import ServerTimingMiddleware, listen_query_timings
+from tests.conftest import test_engine
+from tests.factories.user import UserFactory
+
+
+@pytest.fixture(scope="function")
+def timed_client(db: Session) -> Generator[TestClient]:
+    def override_get_db() -> Generator[Session]:
+        yield db
+
+    server.dependency_overrides[get_db] = override_get_db
+    listen_query_timings(test_engine)
+
+    with TestClient(ServerTimingMiddleware(server)) as c:
+        yield c
+
+    server.dependency_overrides.clear()
+
+
+def _parse_server_timing(header: str) -> dict[str, float]:
+    durations = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        for param in params:
+            key, value = param.split("=", 1)
+            if key == "dur":
+                durations[name] = float(value)
+    return durations
+
+
+def test_server_timing_login(timed_client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    data = {"username": user_params.email, "password": user_params.password}
+    response = timed_client.post(f"{settings.API_V1_STR}/login", data=data)
+    assert response.status_code == 200
+
+    durations = _parse_server_timing(response.headers["Server-Timing"])
+    assert set(durations) == {"db", "bcrypt", "jwt", "render", "total"}
+    phases = sum(duration for name, duration in durations.items() if name != "total")
+    assert phases <= durations["total"]
+
+
+def test_server_timing_rejected_request(timed_client: TestClient) -> None:
+    headers = {"Authorization": "Bearer invalid"}
+    response = timed_client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert response.status_code == 403
+
+    durations = _parse_server_timing(response.headers["Server-Timing"])
+    assert set(durations) == {"jwt", "total"}
+
+
+def test_server_timing_disabled(client: TestClient, db: Session) -> None:
+    user_params = UserFactory.create_random_user(db=db)
+    data = {"username": user_params.email, "password": user_params.password}
+    response = client.post(f"{settings.API_V1_STR}/login", data=data)
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
@@ -0,0 +1,61 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, NamedTuple
+
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+
+class CapturedStatement(NamedTuple):
+    statement: str
+    parameters: Any
+
+
+class QueryPlan:
+    @staticmethod
+    @contextmanager
+    def capture(*, db: Session) -> Iterator[list[CapturedStatement]]:
+        """Collects the SQL that the block sends to the database"""
+        statements: list[CapturedStatement] = []
+
+        def capture_statement(*args: Any) -> None:
+            statements.append(CapturedStatement(statement=args[2], parameters=args[3]))
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", capture_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", capture_statement)
+
+    @staticmethod
+    def _plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        yield plan
+        for sub_plan in plan.get("Plans", []):
+            yield from QueryPlan._plan_nodes(sub_plan)
+
+    @classmethod
+    def seq_scans(
+        cls, *, db: Session, captured: CapturedStatement, row_threshold: int
+    ) -> list[str]:
+        """
+        Names of the tables that the statement reads with a sequential scan
+        while they hold more than row_threshold rows, by the planner's estimate
+        """
+        connection = db.connection()
+        explain = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {captured.statement}", captured.parameters
+        )
+        plan = explain.scalar_one()[0]["Plan"]
+
+        tables = []
+        for node in cls._plan_nodes(plan):
+            if node["Node Type"] != "Seq Scan":
+                continue
+            table_rows = connection.execute(
+                text("SELECT reltuples FROM pg_class WHERE relname = :table"),
+                {"table": node["Relation Name"]},
+            ).scalar_one()
+            if table_rows > row_threshold:
+                tables.append(node["Relation Name"])
+        return tables